@@ -7,7 +7,9 @@ from services.ai_service import (
     categorize_product_gst,
     optimize_delivery_route
 )
-from config.appwrite import tables_db, DATABASE_ID
+from config.appwrite import DATABASE_ID
+from services.repository import db
+from services.catalog_cache import catalog_cache
 from appwrite.query import Query
 
 router = APIRouter(prefix="/ai", tags=["AI"])
@@ -37,7 +39,7 @@ async def get_ai_inventory_insights(request: InventoryInsightsRequest):
     """Get AI-powered inventory insights"""
     try:
         # Fetch inventory
-        inv_result = tables_db.list_rows(
+        inv_result = await db.list_rows(
             database_id=DATABASE_ID,
             table_id="inventory",
             queries=[Query.equal("shop_id", request.shop_id)]
@@ -45,7 +47,7 @@ async def get_ai_inventory_insights(request: InventoryInsightsRequest):
         inventory = inv_result['rows']
         
         # Fetch orders
-        orders_result = tables_db.list_rows(
+        orders_result = await db.list_rows(
             database_id=DATABASE_ID,
             table_id="orders",
             queries=[Query.equal("shop_id", request.shop_id)]
@@ -68,12 +70,8 @@ async def parse_order(request: OrderParseRequest):
     """Parse natural language order text into structured format"""
     try:
         # Get available products
-        prod_result = tables_db.list_rows(
-            database_id=DATABASE_ID,
-            table_id="products",
-            queries=[Query.equal("shop_id", request.shop_id), Query.equal("is_active", True)]
-        )
-        products = prod_result['rows']
+        catalog = await catalog_cache.get(request.shop_id)
+        products = [p for p in catalog if p.get("is_active", True)]
         
         # Parse order
         parsed_order = parse_order_text(request.text, products)
@@ -105,24 +103,18 @@ async def optimize_route(request: RouteOptimizeRequest):
     """Optimize delivery route for given orders"""
     try:
         # Fetch shop location
-        shop = tables_db.get_row(
+        shop = await db.get_row(
             database_id=DATABASE_ID,
             table_id="shops",
             row_id=request.shop_id
         )
         
-        # Fetch orders
-        orders = []
-        for order_id in request.order_ids:
-            try:
-                order = tables_db.get_row(
-                    database_id=DATABASE_ID,
-                    table_id="orders",
-                    row_id=order_id
-                )
-                orders.append(order)
-            except:
-                continue
+        # Fetch orders (unknown IDs are skipped)
+        orders = await db.get_many(
+            database_id=DATABASE_ID,
+            table_id="orders",
+            row_ids=request.order_ids
+        )
         
         # Optimize route
         optimized = optimize_delivery_route(orders, shop)
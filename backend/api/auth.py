@@ -8,7 +8,8 @@ from appwrite.exception import AppwriteException
 from appwrite.id import ID
 from typing import Optional
 
-from config.appwrite import client, tables_db, DATABASE_ID, APPWRITE_ENDPOINT, APPWRITE_PROJECT_ID
+from config.appwrite import client, create_session_client, DATABASE_ID
+from services.repository import db, run_blocking
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -50,7 +51,8 @@ async def register(data: RegisterRequest):
         # Create user in Appwrite
         users = Users(client)
         
-        user = users.create(
+        user = await run_blocking(
+            users.create,
             user_id=ID.unique(),
             email=data.email,
             password=data.password,
@@ -58,7 +60,7 @@ async def register(data: RegisterRequest):
         )
         
         # Create shop for this user
-        shop = tables_db.create_row(
+        shop = await db.create_row(
             database_id=DATABASE_ID,
             table_id="shops",
             row_id=ID.unique(),
@@ -101,28 +103,26 @@ async def login(data: LoginRequest):
     try:
         from appwrite.services.account import Account
         from appwrite.services.users import Users as AdminUsers
-        from appwrite.client import Client
         
         # 1. Create a temporary client for password validation
-        user_client = Client()
-        user_client.set_endpoint(APPWRITE_ENDPOINT)
-        user_client.set_project(APPWRITE_PROJECT_ID)
+        user_client = create_session_client()
         
         account = Account(user_client)
         
         # 2. Create email session (this validates the password)
-        session = account.create_email_password_session(
+        session = await run_blocking(
+            account.create_email_password_session,
             email=data.email,
             password=data.password
         )
         
         # 3. Fetch user details using ADMIN privileges (bypasses "Account" scope issues)
         admin_users = AdminUsers(client)
-        user = admin_users.get(user_id=session['userId'])
+        user = await run_blocking(admin_users.get, user_id=session['userId'])
         
-        # 4. Get user's shop using global tables_db service (Admin)
+        # 4. Get user's shop using global db service (Admin)
         from appwrite.query import Query
-        shop_docs = tables_db.list_rows(
+        shop_docs = await db.list_rows(
             database_id=DATABASE_ID,
             table_id="shops",
             queries=[Query.equal("owner_id", user["$id"])]
@@ -171,20 +171,16 @@ async def get_current_user(
 
     try:
         from appwrite.services.account import Account
-        from appwrite.client import Client
         from appwrite.query import Query
         
         # Create a client for this specific session
-        temp_client = Client()
-        temp_client.set_endpoint(APPWRITE_ENDPOINT)
-        temp_client.set_project(APPWRITE_PROJECT_ID)
-        temp_client.set_session(x_session_id)
+        temp_client = create_session_client(x_session_id)
         
         account = Account(temp_client)
-        user = account.get()
+        user = await run_blocking(account.get)
         
         # Get user's shop using Admin service
-        shops = tables_db.list_rows(
+        shops = await db.list_rows(
             database_id=DATABASE_ID,
             table_id="shops",
             queries=[Query.equal("owner_id", user["$id"])]
@@ -2,11 +2,14 @@
 API Router for Customer endpoints
 """
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from appwrite.exception import AppwriteException
 
-from config.appwrite import tables_db, DATABASE_ID
+from config.appwrite import DATABASE_ID
+from services.repository import db
+from utils.projection import field_selector, select_keys, project_rows
 from models.customer import Customer
+from models.batch import BatchGetRequest
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
 
@@ -15,31 +18,59 @@ router = APIRouter(prefix="/customers", tags=["Customers"])
 async def list_customers(
     limit: int = Query(default=25, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from next_cursor; pass empty for the first page"),
+    projection: Optional[tuple] = Depends(field_selector(Customer)),
     shop_id: Optional[str] = None,
     phone: Optional[str] = None
 ):
     """List customers with filtering"""
     try:
         from appwrite.query import Query
-        queries = [
-            Query.limit(limit),
-            Query.offset(offset)
-        ]
+        queries = []
         
         if shop_id:
             queries.append(Query.equal("shop_id", shop_id))
         if phone:
             queries.append(Query.equal("phone", phone))
         
-        result = tables_db.list_rows(
+        if projection:
+            queries.append(Query.select(select_keys(Customer, projection)))
+        
+        result = await db.list_page(
             database_id=DATABASE_ID,
             table_id="customers",
-            queries=queries
+            queries=queries,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
         )
         
         return {
             "total": result['total'],
-            "customers": [Customer(**doc) for doc in result['rows']]
+            "customers": (
+                project_rows(Customer, result['rows'], projection) if projection
+                else [Customer(**doc) for doc in result['rows']]
+            ),
+            "next_cursor": result['next_cursor']
+        }
+    except AppwriteException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch-get", response_model=dict)
+async def batch_get_customers(request: BatchGetRequest):
+    """Get many customers by ID in one call"""
+    try:
+        rows = await db.get_many(
+            database_id=DATABASE_ID,
+            table_id="customers",
+            row_ids=request.ids
+        )
+        found = {row['$id'] for row in rows}
+        
+        return {
+            "customers": [Customer(**doc) for doc in rows],
+            "missing": [row_id for row_id in dict.fromkeys(request.ids) if row_id not in found]
         }
     except AppwriteException as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -49,7 +80,7 @@ async def list_customers(
 async def get_customer(customer_id: str):
     """Get a single customer by ID"""
     try:
-        customer = tables_db.get_row(
+        customer = await db.get_row(
             database_id=DATABASE_ID,
             table_id="customers",
             row_id=customer_id
@@ -69,7 +100,7 @@ async def create_customer(customer_data: Customer):
         
         data = customer_data.model_dump(by_alias=True, exclude={"id", "created_at", "updated_at"})
         
-        customer = tables_db.create_row(
+        customer = await db.create_row(
             database_id=DATABASE_ID,
             table_id="customers",
             row_id=ID.unique(),
@@ -84,7 +115,7 @@ async def create_customer(customer_data: Customer):
 async def update_customer(customer_id: str, customer_data: dict):
     """Update a customer"""
     try:
-        customer = tables_db.update_row(
+        customer = await db.update_row(
             database_id=DATABASE_ID,
             table_id="customers",
             row_id=customer_id,
@@ -101,7 +132,7 @@ async def update_customer(customer_id: str, customer_data: dict):
 async def delete_customer(customer_id: str):
     """Delete a customer"""
     try:
-        tables_db.delete_row(
+        await db.delete_row(
             database_id=DATABASE_ID,
             table_id="customers",
             row_id=customer_id
@@ -3,10 +3,13 @@ API Router for Delivery endpoints
 """
 import math
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from appwrite.exception import AppwriteException
 
-from config.appwrite import tables_db, DATABASE_ID
+from config.appwrite import DATABASE_ID
+from services.repository import db
+from utils.projection import field_selector, select_keys, project_rows
+from utils.fast_json import validate_rows
 from models.delivery import Delivery, Crate, DeliveryStop, DeliveryPartner
 from utils.routing import nearest_neighbor_route, calculate_total_distance, estimate_delivery_time
 
@@ -17,31 +20,40 @@ router = APIRouter(prefix="/deliveries", tags=["Deliveries"])
 async def list_deliveries(
     limit: int = Query(default=25, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from next_cursor; pass empty for the first page"),
+    projection: Optional[tuple] = Depends(field_selector(Delivery)),
     shop_id: Optional[str] = None,
     status: Optional[str] = None
 ):
     """List delivery batches with filtering"""
     try:
         from appwrite.query import Query
-        queries = [
-            Query.limit(limit),
-            Query.offset(offset)
-        ]
+        queries = []
         
         if shop_id:
             queries.append(Query.equal("shop_id", shop_id))
         if status:
             queries.append(Query.equal("status", status))
         
-        result = tables_db.list_rows(
+        if projection:
+            queries.append(Query.select(select_keys(Delivery, projection)))
+        
+        result = await db.list_page(
             database_id=DATABASE_ID,
             table_id="deliveries",
-            queries=queries
+            queries=queries,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
         )
         
         return {
             "total": result['total'],
-            "deliveries": [Delivery(**doc) for doc in result['rows']]
+            "deliveries": (
+                project_rows(Delivery, result['rows'], projection) if projection
+                else validate_rows(Delivery, result['rows'])
+            ),
+            "next_cursor": result['next_cursor']
         }
     except AppwriteException as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -51,7 +63,7 @@ async def list_deliveries(
 async def get_delivery(delivery_id: str):
     """Get a single delivery batch by ID"""
     try:
-        delivery = tables_db.get_row(
+        delivery = await db.get_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=delivery_id
@@ -71,7 +83,7 @@ async def create_delivery_batch(delivery_data: Delivery):
         
         data = delivery_data.model_dump(by_alias=True, exclude={"id", "created_at", "updated_at"})
         
-        delivery = tables_db.create_row(
+        delivery = await db.create_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=ID.unique(),
@@ -86,7 +98,7 @@ async def create_delivery_batch(delivery_data: Delivery):
 async def update_delivery(delivery_id: str, delivery_data: dict):
     """Update a delivery batch"""
     try:
-        delivery = tables_db.update_row(
+        delivery = await db.update_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=delivery_id,
@@ -105,7 +117,7 @@ async def start_delivery(delivery_id: str):
     try:
         from datetime import datetime
         
-        delivery = tables_db.update_row(
+        delivery = await db.update_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=delivery_id,
@@ -127,7 +139,7 @@ async def complete_delivery(delivery_id: str):
     try:
         from datetime import datetime
         
-        delivery = tables_db.update_row(
+        delivery = await db.update_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=delivery_id,
@@ -153,19 +165,13 @@ async def create_route(
     """Create a new delivery route with crate-based batching"""
     try:
         from appwrite.id import ID
-        from appwrite.query import Query as AppwriteQuery
         
         # Fetch orders to get customer addresses
-        orders_result = tables_db.list_rows(
+        orders = await db.get_many(
             database_id=DATABASE_ID,
             table_id="orders",
-            queries=[
-                AppwriteQuery.equal("$id", order_ids),
-                AppwriteQuery.limit(len(order_ids))
-            ]
+            row_ids=order_ids
         )
-        
-        orders = orders_result['rows']
         if not orders:
             raise HTTPException(status_code=400, detail="No valid orders found")
         
@@ -238,7 +244,7 @@ async def create_route(
         if delivery_partner:
             delivery_data['delivery_partner'] = delivery_partner
         
-        delivery = tables_db.create_row(
+        delivery = await db.create_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=ID.unique(),
@@ -268,7 +274,7 @@ async def update_delivery_status(
     
     try:
         # Get current delivery
-        delivery = tables_db.get_row(
+        delivery = await db.get_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=delivery_id
@@ -307,7 +313,7 @@ async def update_delivery_status(
             from datetime import datetime
             update_data['completed_at'] = datetime.utcnow().isoformat()
         
-        updated = tables_db.update_row(
+        updated = await db.update_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=delivery_id,
@@ -325,7 +331,7 @@ async def update_delivery_status(
 async def update_stop_status(delivery_id: str, stop_sequence: int):
     """Mark a stop as delivered and advance current pointer"""
     try:
-        delivery = tables_db.get_row(
+        delivery = await db.get_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=delivery_id
@@ -340,7 +346,7 @@ async def update_stop_status(delivery_id: str, stop_sequence: int):
             elif stop['sequence'] == stop_sequence + 1:
                 stop['status'] = 'current'
         
-        updated = tables_db.update_row(
+        updated = await db.update_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=delivery_id,
@@ -358,7 +364,7 @@ async def update_stop_status(delivery_id: str, stop_sequence: int):
 async def delete_delivery(delivery_id: str):
     """Delete a delivery batch"""
     try:
-        tables_db.delete_row(
+        await db.delete_row(
             database_id=DATABASE_ID,
             table_id="deliveries",
             row_id=delivery_id
@@ -2,12 +2,18 @@
 Forecasting API Router
 Demand prediction and inventory recommendations
 """
+import json
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from pydantic import BaseModel
 from datetime import datetime
 
-from services.forecasting import get_demand_forecast
+from services.forecasting import (
+    get_demand_forecast, find_product, get_product_trend, get_reorder_plan, enrich_forecast
+)
+from services.forecast_insights import forecast_insights
+from services.daily_sales import get_daily_sales
 
 router = APIRouter(prefix="/forecasting", tags=["Forecasting"])
 
@@ -21,6 +27,7 @@ class ForecastResponse(BaseModel):
     products_tracked: int
     predictions: list
     insights: list
+    insights_status: Optional[str] = None  # pending / ready / failed (use_ai only)
     risk_items: list
     summary: dict
 
@@ -36,7 +43,8 @@ async def get_forecast(
     Returns:
     - Product-level demand predictions for next 7 days
     - Reorder recommendations
-    - AI-powered insights
+    - AI-powered insights (cached; `insights_status: pending` while they are
+      generated in the background - poll or stream /forecasting/insights/{shop_id})
     - Risk items (products likely to run out)
     """
     print(f"\n🔮 FORECAST REQUEST")
@@ -69,7 +77,10 @@ async def get_quick_insights(shop_id: str):
         forecast = await get_demand_forecast(shop_id, use_ai=False)
         
         # Extract just the key insights
-        critical_items = [p for p in forecast["predictions"] if p["days_until_stockout"] < 3]
+        critical_items = [
+            p for p in forecast["predictions"]
+            if p["inventory_tracked"] and p["days_until_stockout"] < 3
+        ]
         need_reorder = [p for p in forecast["predictions"] if p["reorder_recommended"]]
         
         return {
@@ -106,26 +117,134 @@ async def get_quick_insights(shop_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/reorder-plan/{shop_id}")
+async def get_budget_reorder_plan(
+    shop_id: str,
+    budget: float = Query(..., gt=0, description="Cash available for restocking (₹)"),
+    horizon_days: int = Query(14, ge=1, le=60, description="Days of demand the restock should cover")
+):
+    """
+    Restock plan that fits a cash budget.
+    
+    Spends the budget on the units that avoid the most expected stockouts per
+    rupee, most urgent products first. Compare `summary.unconstrained_cost` (what
+    full cover would cost) with `spent`; `underfunded_items` are still at risk.
+    """
+    try:
+        return await get_reorder_plan(shop_id, budget, horizon_days=horizon_days)
+    except Exception as e:
+        print(f"❌ Reorder plan error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/insights/{shop_id}")
+async def get_ai_insights(shop_id: str):
+    """
+    Poll the shop's AI forecast insights.
+    Starts generating them in the background if none are cached; status is
+    pending until they are ready (or failed).
+    """
+    return {"shop_id": shop_id, **forecast_insights.ensure(shop_id, enrich_forecast)}
+
+
+@router.get("/insights/{shop_id}/stream")
+async def stream_ai_insights(
+    shop_id: str,
+    timeout: float = Query(60, gt=0, le=300, description="Seconds to wait for pending insights")
+):
+    """
+    Server-sent events: one `status` event with the current state, then an
+    `insights` event when background generation finishes (or `timeout` when it
+    is still running after `timeout` seconds - reconnect to keep waiting).
+    """
+    async def events():
+        state = forecast_insights.ensure(shop_id, enrich_forecast)
+        yield f"event: status\ndata: {json.dumps(state)}\n\n"
+        if state["status"] != "pending":
+            return
+        state = await forecast_insights.wait(shop_id, enrich_forecast, timeout)
+        event = "timeout" if state["status"] == "pending" else "insights"
+        yield f"event: {event}\ndata: {json.dumps(state)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/sales/{shop_id}")
+async def get_sales_rollup(
+    shop_id: str,
+    days: int = Query(30, ge=1, le=365, description="Window size in days"),
+    product_id: Optional[str] = Query(None, description="Only this product ('*' for shop totals)")
+):
+    """
+    Daily sales per product from the daily_sales rollup.
+    Rows with product_id '*' carry shop-wide totals and the day's order count.
+    """
+    try:
+        rows = await get_daily_sales(shop_id, days=days, product_id=product_id)
+        return {
+            "shop_id": shop_id,
+            "days": days,
+            "sales": sorted(
+                (
+                    {
+                        "date": row["date"],
+                        "product_id": row["product_id"],
+                        "product_name": row["product_name"],
+                        "quantity": row["quantity"],
+                        "revenue": row["revenue"],
+                        "order_count": row["order_count"],
+                    }
+                    for row in rows
+                ),
+                key=lambda r: (r["date"], r["product_id"])
+            )
+        }
+    except Exception as e:
+        print(f"❌ Sales rollup error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/product-trend/{shop_id}/{product_id}")
+async def get_product_trend_by_id(
+    shop_id: str,
+    product_id: str,
+    days: int = Query(30, ge=7, le=365, description="History window in days")
+):
+    """
+    One product's daily sales with the fitted trend, weekly pattern and 7-day
+    forecast. Reads only this product's rollup rows, so it does not wait on the
+    shop-wide forecast (for product detail pages).
+    """
+    try:
+        trend = await get_product_trend(shop_id, product_id, days=days)
+    except Exception as e:
+        print(f"❌ Product trend error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not trend:
+        raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
+    return trend
+
+
 @router.get("/trends/{shop_id}/{product_name}")
 async def get_product_trends(shop_id: str, product_name: str):
     """
     Get detailed trends for a specific product.
+    (By name; /forecasting/product-trend/{shop_id}/{product_id} skips the name lookup.)
     """
-    forecast = await get_demand_forecast(shop_id, use_ai=False)
-    
-    # Find the product
-    product_forecast = next(
-        (p for p in forecast["predictions"] if p["product_name"].lower() == product_name.lower()),
-        None
-    )
+    product = await find_product(shop_id, product_name)
+    trend = await get_product_trend(shop_id, product["$id"]) if product else None
     
-    if not product_forecast:
+    if not trend:
         raise HTTPException(status_code=404, detail=f"Product '{product_name}' not found")
     
+    product_forecast = trend["forecast"]
     return {
         "product": product_name,
         "shop_id": shop_id,
         "forecast": product_forecast,
+        "daily_sales": trend["daily_sales"],
+        "trend": trend["trend"],
         "recommendation": (
             f"Reorder {product_forecast['reorder_quantity']:.0f} units within "
             f"{max(0, product_forecast['days_until_stockout'] - 2):.0f} days"
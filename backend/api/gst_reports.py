@@ -1,10 +1,12 @@
 import json
 from datetime import datetime
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from appwrite.exception import AppwriteException
 
-from config.appwrite import tables_db, DATABASE_ID
+from config.appwrite import DATABASE_ID
+from services.repository import db
+from utils.projection import field_selector, select_keys, project_rows
 from models.gst import GSTReport
 
 router = APIRouter(prefix="/gst-reports", tags=["GST Reports"])
@@ -14,6 +16,8 @@ router = APIRouter(prefix="/gst-reports", tags=["GST Reports"])
 async def list_gst_reports(
     limit: int = Query(default=25, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from next_cursor; pass empty for the first page"),
+    projection: Optional[tuple] = Depends(field_selector(GSTReport)),
     shop_id: Optional[str] = None,
     period: Optional[str] = None,
     status: Optional[str] = None
@@ -21,10 +25,7 @@ async def list_gst_reports(
     """List GST reports with filtering"""
     try:
         from appwrite.query import Query
-        queries = [
-            Query.limit(limit),
-            Query.offset(offset)
-        ]
+        queries = []
         
         if shop_id:
             queries.append(Query.equal("shop_id", shop_id))
@@ -33,13 +34,18 @@ async def list_gst_reports(
         if status:
             queries.append(Query.equal("status", status))
         
-        result = tables_db.list_rows(
+        if projection:
+            queries.append(Query.select(select_keys(GSTReport, projection)))
+        
+        result = await db.list_page(
             database_id=DATABASE_ID,
             table_id="gst_reports",
-            queries=queries
+            queries=queries,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
         )
         
-        reports = []
         for doc in result['rows']:
             # Parse JSON strings from Appwrite
             if isinstance(doc.get('breakdown'), str):
@@ -48,12 +54,16 @@ async def list_gst_reports(
             if isinstance(doc.get('report_data'), str):
                 try: doc['report_data'] = json.loads(doc['report_data'])
                 except: doc['report_data'] = {}
-            
-            reports.append(GSTReport(**doc))
+        
+        reports = (
+            project_rows(GSTReport, result['rows'], projection) if projection
+            else [GSTReport(**doc) for doc in result['rows']]
+        )
             
         return {
             "total": result['total'],
-            "reports": reports
+            "reports": reports,
+            "next_cursor": result['next_cursor']
         }
     except AppwriteException as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -63,7 +73,7 @@ async def list_gst_reports(
 async def get_gst_report(report_id: str):
     """Get a single GST report by ID"""
     try:
-        report = tables_db.get_row(
+        report = await db.get_row(
             database_id=DATABASE_ID,
             table_id="gst_reports",
             row_id=report_id
@@ -95,7 +105,7 @@ async def create_gst_report(report_data: GSTReport):
         if isinstance(data.get('report_data'), dict):
             data['report_data'] = json.dumps(data['report_data'])
             
-        report = tables_db.create_row(
+        report = await db.create_row(
             database_id=DATABASE_ID,
             table_id="gst_reports",
             row_id=ID.unique(),
@@ -117,7 +127,7 @@ async def create_gst_report(report_data: GSTReport):
 async def update_gst_report(report_id: str, report_data: dict):
     """Update a GST report"""
     try:
-        report = tables_db.update_row(
+        report = await db.update_row(
             database_id=DATABASE_ID,
             table_id="gst_reports",
             row_id=report_id,
@@ -136,7 +146,7 @@ async def file_gst_report(report_id: str):
     try:
         from datetime import datetime
         
-        report = tables_db.update_row(
+        report = await db.update_row(
             database_id=DATABASE_ID,
             table_id="gst_reports",
             row_id=report_id,
@@ -156,7 +166,7 @@ async def file_gst_report(report_id: str):
 async def delete_gst_report(report_id: str):
     """Delete a GST report"""
     try:
-        tables_db.delete_row(
+        await db.delete_row(
             database_id=DATABASE_ID,
             table_id="gst_reports",
             row_id=report_id
@@ -2,50 +2,63 @@
 API Router for Inventory endpoints
 """
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from appwrite.exception import AppwriteException
 
-from config.appwrite import tables_db, DATABASE_ID
-from models.inventory import Inventory
+from config.appwrite import DATABASE_ID
+from services.forecast_cache import forecast_cache
+from services.repository import db
+from utils.projection import field_selector, select_keys, project_rows
+from models.inventory import Inventory, is_low_stock
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
 
+STOCK_COLUMNS = ("stock_quantity", "min_stock_level")
+
 
 @router.get("/", response_model=dict)
 async def list_inventory(
     limit: int = Query(default=25, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from next_cursor; pass empty for the first page"),
+    projection: Optional[tuple] = Depends(field_selector(Inventory)),
     shop_id: Optional[str] = None,
     low_stock: bool = False
 ):
     """List inventory items with optional low stock filter"""
     try:
         from appwrite.query import Query
-        queries = [
-            Query.limit(limit),
-            Query.offset(offset)
-        ]
+        queries = []
         
         if shop_id:
             queries.append(Query.equal("shop_id", shop_id))
         
-        result = tables_db.list_rows(
+        if low_stock:
+            # Served by shop_low_stock_idx, so totals and paging cover the whole table
+            queries.append(Query.equal("is_low_stock", True))
+        
+        if projection:
+            queries.append(Query.select(select_keys(Inventory, projection)))
+        
+        result = await db.list_page(
             database_id=DATABASE_ID,
             table_id="inventory",
-            queries=queries
+            queries=queries,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
         )
         
-        # Filter low stock items if requested
-        items = [Inventory(**doc) for doc in result['rows']]
-        if low_stock:
-            items = [
-                item for item in items 
-                if item.stock_quantity <= item.min_stock_level
-            ]
+        rows = result['rows']
+        items = (
+            project_rows(Inventory, rows, projection) if projection
+            else [Inventory(**doc) for doc in rows]
+        )
         
         return {
-            "total": len(items) if low_stock else result['total'],
-            "inventory": items
+            "total": result['total'],
+            "inventory": items,
+            "next_cursor": result['next_cursor']
         }
     except AppwriteException as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -55,14 +68,14 @@ async def list_inventory(
 async def get_inventory_item(inventory_id: str):
     """Get a single inventory item by ID"""
     try:
-        item = tables_db.get_row(
+        item = await db.get_row(
             database_id=DATABASE_ID,
             table_id="inventory",
             row_id=inventory_id
         )
         return Inventory(**item)
     except AppwriteException as e:
-        if "not found" in str(e).lower():
+        if e.code == 404:
             raise HTTPException(status_code=404, detail=f"Inventory {inventory_id} not found")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -74,13 +87,16 @@ async def create_inventory_item(inventory_data: Inventory):
         from appwrite.id import ID
         
         data = inventory_data.model_dump(by_alias=True, exclude={"id", "created_at", "updated_at"})
+        data["is_low_stock"] = is_low_stock(data["stock_quantity"], data["min_stock_level"])
         
-        item = tables_db.create_row(
+        item = await db.create_row(
             database_id=DATABASE_ID,
             table_id="inventory",
             row_id=ID.unique(),
             data=data
         )
+        # Forecasts read stock from inventory
+        forecast_cache.invalidate(item["shop_id"])
         return Inventory(**item)
     except AppwriteException as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -90,15 +106,38 @@ async def create_inventory_item(inventory_data: Inventory):
 async def update_inventory_item(inventory_id: str, inventory_data: dict):
     """Update an inventory item"""
     try:
-        item = tables_db.update_row(
+        # is_low_stock is derived - recompute it whenever either stock column changes
+        inventory_data = {k: v for k, v in inventory_data.items() if k != "is_low_stock"}
+        for column in STOCK_COLUMNS:
+            value = inventory_data.get(column, 0)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise HTTPException(status_code=400, detail=f"{column} must be a number")
+        if "stock_quantity" in inventory_data or "min_stock_level" in inventory_data:
+            current = inventory_data
+            if not ("stock_quantity" in inventory_data and "min_stock_level" in inventory_data):
+                current = {
+                    **await db.get_row(
+                        database_id=DATABASE_ID,
+                        table_id="inventory",
+                        row_id=inventory_id
+                    ),
+                    **inventory_data
+                }
+            inventory_data["is_low_stock"] = is_low_stock(
+                float(current["stock_quantity"]),
+                float(current["min_stock_level"])
+            )
+        
+        item = await db.update_row(
             database_id=DATABASE_ID,
             table_id="inventory",
             row_id=inventory_id,
             data=inventory_data
         )
+        forecast_cache.invalidate(item["shop_id"])
         return Inventory(**item)
     except AppwriteException as e:
-        if "not found" in str(e).lower():
+        if e.code == 404:
             raise HTTPException(status_code=404, detail=f"Inventory {inventory_id} not found")
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -107,13 +146,20 @@ async def update_inventory_item(inventory_id: str, inventory_data: dict):
 async def delete_inventory_item(inventory_id: str):
     """Delete an inventory item"""
     try:
-        tables_db.delete_row(
+        # Read first: the shop's forecast must stop using this stock
+        item = await db.get_row(
+            database_id=DATABASE_ID,
+            table_id="inventory",
+            row_id=inventory_id
+        )
+        await db.delete_row(
             database_id=DATABASE_ID,
             table_id="inventory",
             row_id=inventory_id
         )
+        forecast_cache.invalidate(item["shop_id"])
         return None
     except AppwriteException as e:
-        if "not found" in str(e).lower():
+        if e.code == 404:
             raise HTTPException(status_code=404, detail=f"Inventory {inventory_id} not found")
         raise HTTPException(status_code=500, detail=str(e))
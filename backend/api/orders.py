@@ -2,11 +2,16 @@
 API Router for Order endpoints
 """
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from appwrite.exception import AppwriteException
 
-from config.appwrite import tables_db, DATABASE_ID
+from config.appwrite import DATABASE_ID
+from services.repository import db
+from services.daily_sales import apply_order_change
+from utils.projection import field_selector, select_keys, project_rows
+from utils.fast_json import validate_rows
 from models.order import Order
+from models.batch import BatchGetRequest
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
@@ -15,6 +20,8 @@ router = APIRouter(prefix="/orders", tags=["Orders"])
 async def list_orders(
     limit: int = Query(default=25, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from next_cursor; pass empty for the first page"),
+    projection: Optional[tuple] = Depends(field_selector(Order)),
     shop_id: Optional[str] = None,
     customer_id: Optional[str] = None,
     status: Optional[str] = None,
@@ -23,10 +30,7 @@ async def list_orders(
     """List orders with filtering"""
     try:
         from appwrite.query import Query
-        queries = [
-            Query.limit(limit),
-            Query.offset(offset)
-        ]
+        queries = []
         
         if shop_id:
             queries.append(Query.equal("shop_id", shop_id))
@@ -37,15 +41,44 @@ async def list_orders(
         if source:
             queries.append(Query.equal("source", source))
         
-        result = tables_db.list_rows(
+        if projection:
+            queries.append(Query.select(select_keys(Order, projection)))
+        
+        result = await db.list_page(
             database_id=DATABASE_ID,
             table_id="orders",
-            queries=queries
+            queries=queries,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
         )
         
         return {
             "total": result['total'],
-            "orders": [Order(**doc) for doc in result['rows']]
+            "orders": (
+                project_rows(Order, result['rows'], projection) if projection
+                else validate_rows(Order, result['rows'])
+            ),
+            "next_cursor": result['next_cursor']
+        }
+    except AppwriteException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch-get", response_model=dict)
+async def batch_get_orders(request: BatchGetRequest):
+    """Get many orders by ID in one call"""
+    try:
+        rows = await db.get_many(
+            database_id=DATABASE_ID,
+            table_id="orders",
+            row_ids=request.ids
+        )
+        found = {row['$id'] for row in rows}
+        
+        return {
+            "orders": [Order(**doc) for doc in rows],
+            "missing": [row_id for row_id in dict.fromkeys(request.ids) if row_id not in found]
         }
     except AppwriteException as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -55,7 +88,7 @@ async def list_orders(
 async def get_order(order_id: str):
     """Get a single order by ID"""
     try:
-        order = tables_db.get_row(
+        order = await db.get_row(
             database_id=DATABASE_ID,
             table_id="orders",
             row_id=order_id
@@ -76,12 +109,13 @@ async def create_order(order_data: Order):
         # Exclude ID and timestamps for creation
         data = order_data.model_dump(by_alias=True, exclude={"id", "created_at", "updated_at"})
         
-        order = tables_db.create_row(
+        order = await db.create_row(
             database_id=DATABASE_ID,
             table_id="orders",
             row_id=ID.unique(),
             data=data
         )
+        await apply_order_change(None, order)
         return Order(**order)
     except AppwriteException as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -91,12 +125,23 @@ async def create_order(order_data: Order):
 async def update_order(order_id: str, order_data: dict):
     """Update an order"""
     try:
-        order = tables_db.update_row(
+        # Previous state is needed to adjust the daily_sales rollup
+        before = None
+        if "status" in order_data or "items" in order_data:
+            before = await db.get_row(
+                database_id=DATABASE_ID,
+                table_id="orders",
+                row_id=order_id
+            )
+        
+        order = await db.update_row(
             database_id=DATABASE_ID,
             table_id="orders",
             row_id=order_id,
             data=order_data
         )
+        if before:
+            await apply_order_change(before, order)
         return Order(**order)
     except AppwriteException as e:
         if "not found" in str(e).lower():
@@ -115,12 +160,19 @@ async def update_order_status(order_id: str, status: str):
                 detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
             )
         
-        order = tables_db.update_row(
+        before = await db.get_row(
+            database_id=DATABASE_ID,
+            table_id="orders",
+            row_id=order_id
+        )
+        
+        order = await db.update_row(
             database_id=DATABASE_ID,
             table_id="orders",
             row_id=order_id,
             data={"status": status}
         )
+        await apply_order_change(before, order)
         return Order(**order)
     except HTTPException:
         raise
@@ -134,11 +186,18 @@ async def update_order_status(order_id: str, status: str):
 async def delete_order(order_id: str):
     """Delete an order"""
     try:
-        tables_db.delete_row(
+        before = await db.get_row(
+            database_id=DATABASE_ID,
+            table_id="orders",
+            row_id=order_id
+        )
+        
+        await db.delete_row(
             database_id=DATABASE_ID,
             table_id="orders",
             row_id=order_id
         )
+        await apply_order_change(before, None)
         return None
     except AppwriteException as e:
         if "not found" in str(e).lower():
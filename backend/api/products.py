@@ -2,11 +2,17 @@
 API Router for Product endpoints
 """
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from appwrite.exception import AppwriteException
 
-from config.appwrite import tables_db, DATABASE_ID
+from config.appwrite import DATABASE_ID
+from services.repository import db
+from utils.projection import field_selector, select_keys, project_rows
 from models.product import Product
+from models.batch import BatchGetRequest
+from services.catalog_cache import catalog_cache
+from services.forecast_cache import forecast_cache
+from services.catalog_import import CatalogFormatError, import_catalog
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
@@ -15,6 +21,8 @@ router = APIRouter(prefix="/products", tags=["Products"])
 async def list_products(
     limit: int = Query(default=25, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from next_cursor; pass empty for the first page"),
+    projection: Optional[tuple] = Depends(field_selector(Product)),
     shop_id: Optional[str] = None,
     category: Optional[str] = None,
     is_active: Optional[bool] = None
@@ -22,10 +30,7 @@ async def list_products(
     """List products with filtering"""
     try:
         from appwrite.query import Query
-        queries = [
-            Query.limit(limit),
-            Query.offset(offset)
-        ]
+        queries = []
         
         if shop_id:
             queries.append(Query.equal("shop_id", shop_id))
@@ -34,15 +39,75 @@ async def list_products(
         if is_active is not None:
             queries.append(Query.equal("is_active", is_active))
         
-        result = tables_db.list_rows(
+        if projection:
+            queries.append(Query.select(select_keys(Product, projection)))
+        
+        result = await db.list_page(
             database_id=DATABASE_ID,
             table_id="products",
-            queries=queries
+            queries=queries,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
         )
         
         return {
             "total": result['total'],
-            "products": [Product(**doc) for doc in result['rows']]
+            "products": (
+                project_rows(Product, result['rows'], projection) if projection
+                else [Product(**doc) for doc in result['rows']]
+            ),
+            "next_cursor": result['next_cursor']
+        }
+    except AppwriteException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/bulk", response_model=dict)
+async def bulk_import_products(
+    request: Request,
+    shop_id: Optional[str] = None,
+    format: Optional[str] = Query(default=None, pattern="^(csv|ndjson)$")
+):
+    """
+    Bulk import products (and optional inventory) from CSV or NDJSON.
+    
+    - Columns / keys follow the Product model; add `stock_quantity`
+      (and optionally `min_stock_level`) to create an inventory row too
+    - `shop_id` fills rows that don't carry their own
+    - Format comes from `format` or the Content-Type (text/csv, application/x-ndjson)
+    
+    Returns a per-row report: created / partial / invalid / error.
+    """
+    if not format:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson" if "ndjson" in content_type else None
+    if not format:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson"
+        )
+    
+    try:
+        return await import_catalog(request.stream(), format, default_shop_id=shop_id)
+    except CatalogFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/batch-get", response_model=dict)
+async def batch_get_products(request: BatchGetRequest):
+    """Get many products by ID in one call"""
+    try:
+        rows = await db.get_many(
+            database_id=DATABASE_ID,
+            table_id="products",
+            row_ids=request.ids
+        )
+        found = {row['$id'] for row in rows}
+        
+        return {
+            "products": [Product(**doc) for doc in rows],
+            "missing": [row_id for row_id in dict.fromkeys(request.ids) if row_id not in found]
         }
     except AppwriteException as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -52,7 +117,7 @@ async def list_products(
 async def get_product(product_id: str):
     """Get a single product by ID"""
     try:
-        product = tables_db.get_row(
+        product = await db.get_row(
             database_id=DATABASE_ID,
             table_id="products",
             row_id=product_id
@@ -73,12 +138,14 @@ async def create_product(product_data: Product):
         # Exclude ID and timestamps for creation
         data = product_data.model_dump(by_alias=True, exclude={"id", "created_at", "updated_at"})
         
-        product = tables_db.create_row(
+        product = await db.create_row(
             database_id=DATABASE_ID,
             table_id="products",
             row_id=ID.unique(),
             data=data
         )
+        catalog_cache.invalidate(product['shop_id'])
+        forecast_cache.invalidate(product['shop_id'])
         return Product(**product)
     except AppwriteException as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -88,12 +155,16 @@ async def create_product(product_data: Product):
 async def update_product(product_id: str, product_data: dict):
     """Update a product"""
     try:
-        product = tables_db.update_row(
+        product = await db.update_row(
             database_id=DATABASE_ID,
             table_id="products",
             row_id=product_id,
             data=product_data
         )
+        catalog_cache.invalidate_product(product_id)  # covers a shop_id change
+        catalog_cache.invalidate(product['shop_id'])
+        forecast_cache.invalidate_product(product_id)
+        forecast_cache.invalidate(product['shop_id'])
         return Product(**product)
     except AppwriteException as e:
         if "not found" in str(e).lower():
@@ -105,11 +176,13 @@ async def update_product(product_id: str, product_data: dict):
 async def delete_product(product_id: str):
     """Delete a product"""
     try:
-        tables_db.delete_row(
+        await db.delete_row(
             database_id=DATABASE_ID,
             table_id="products",
             row_id=product_id
         )
+        catalog_cache.invalidate_product(product_id)
+        forecast_cache.invalidate_product(product_id)
         return None
     except AppwriteException as e:
         if "not found" in str(e).lower():
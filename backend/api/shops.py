@@ -2,10 +2,12 @@
 API Router for Shop endpoints
 """
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from appwrite.exception import AppwriteException
 
-from config.appwrite import tables_db, DATABASE_ID
+from config.appwrite import DATABASE_ID
+from services.repository import db
+from utils.projection import field_selector, select_keys, project_rows
 from models.shop import Shop
 
 router = APIRouter(prefix="/shops", tags=["Shops"])
@@ -15,29 +17,38 @@ router = APIRouter(prefix="/shops", tags=["Shops"])
 async def list_shops(
     limit: int = Query(default=25, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from next_cursor; pass empty for the first page"),
+    projection: Optional[tuple] = Depends(field_selector(Shop)),
     owner_id: Optional[str] = None
 ):
     """List all shops with optional filtering"""
     print(f"📡 API: list_shops called with owner_id={owner_id}")
     try:
         from appwrite.query import Query
-        queries = [
-            Query.limit(limit),
-            Query.offset(offset)
-        ]
+        queries = []
         
         if owner_id:
             queries.append(Query.equal("owner_id", owner_id))
         
-        result = tables_db.list_rows(
+        if projection:
+            queries.append(Query.select(select_keys(Shop, projection)))
+        
+        result = await db.list_page(
             database_id=DATABASE_ID,
             table_id="shops",
-            queries=queries
+            queries=queries,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
         )
         
         return {
             "total": result['total'],
-            "shops": [Shop(**doc) for doc in result['rows']]
+            "shops": (
+                project_rows(Shop, result['rows'], projection) if projection
+                else [Shop(**doc) for doc in result['rows']]
+            ),
+            "next_cursor": result['next_cursor']
         }
     except Exception as e:
         print(f"❌ Error in list_shops: {e}")
@@ -50,7 +61,7 @@ async def list_shops(
 async def get_shop(shop_id: str):
     """Get a single shop by ID"""
     try:
-        shop = tables_db.get_row(
+        shop = await db.get_row(
             database_id=DATABASE_ID,
             table_id="shops",
             row_id=shop_id
@@ -70,7 +81,7 @@ async def create_shop(shop_data: Shop):
         
         data = shop_data.model_dump(by_alias=True, exclude={"id", "created_at", "updated_at"})
         
-        shop = tables_db.create_row(
+        shop = await db.create_row(
             database_id=DATABASE_ID,
             table_id="shops",
             row_id=ID.unique(),
@@ -85,7 +96,7 @@ async def create_shop(shop_data: Shop):
 async def update_shop(shop_id: str, shop_data: dict):
     """Update a shop"""
     try:
-        shop = tables_db.update_row(
+        shop = await db.update_row(
             database_id=DATABASE_ID,
             table_id="shops",
             row_id=shop_id,
@@ -102,7 +113,7 @@ async def update_shop(shop_id: str, shop_data: dict):
 async def delete_shop(shop_id: str):
     """Delete a shop"""
     try:
-        tables_db.delete_row(
+        await db.delete_row(
             database_id=DATABASE_ID,
             table_id="shops",
             row_id=shop_id
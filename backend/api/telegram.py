@@ -17,7 +17,9 @@ from services.menu_validator import (
 )
 from services.ai_service import AIService
 from services.order_prompts import EXTRACT_ITEMS_PROMPT
-from config.appwrite import tables_db, DATABASE_ID
+from config.appwrite import DATABASE_ID
+from services.repository import db
+from services.daily_sales import apply_order_change
 from config.settings import settings
 from appwrite.id import ID
 
@@ -507,7 +509,8 @@ async def handle_callback_query(chat_id: int, user_id: int, callback_data: str,
             
             import uuid
             unique_id = str(uuid.uuid4()).replace('-', '')[:20]
-            result = tables_db.create_row(DATABASE_ID, "orders", unique_id, order_data)
+            result = await db.create_row(DATABASE_ID, "orders", unique_id, order_data)
+            await apply_order_change(None, result)
             session.order_id = result.get("$id")
             session.state = IntakeState.COMPLETE
             
@@ -22,7 +22,9 @@ from services.menu_validator import (
 )
 from services.ai_service import AIService
 from services.order_prompts import EXTRACT_ITEMS_PROMPT
-from config.appwrite import tables_db, DATABASE_ID
+from config.appwrite import DATABASE_ID
+from services.repository import db
+from services.daily_sales import apply_order_change
 from appwrite.id import ID
 
 router = APIRouter(prefix="/twilio", tags=["Twilio Voice"])
@@ -264,7 +266,8 @@ async def handle_confirmation(
                 "notes": f"Voice order from {session.user_id}"
             }
             
-            result = tables_db.create_row(DATABASE_ID, "orders", ID.unique(), order_data)
+            result = await db.create_row(DATABASE_ID, "orders", ID.unique(), order_data)
+            await apply_order_change(None, result)
             session.order_id = result.get("$id")
             session.state = IntakeState.COMPLETE
             
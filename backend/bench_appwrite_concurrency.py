@@ -0,0 +1,133 @@
+"""
+Concurrency benchmark for the Appwrite data-access layer.
+
+Starts a local Appwrite stand-in (stdlib HTTP server with artificial latency),
+then fires concurrent GET /orders/ requests at two FastAPI apps:
+  - blocking: handler calls the sync TablesDB directly (old pattern)
+  - async:    the real orders router, going through services.repository
+
+Usage:
+    python bench_appwrite_concurrency.py [--requests 200] [--concurrency 50] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_order_row(i: int) -> dict:
+    return {
+        "$id": f"order{i:06d}",
+        "$createdAt": "2026-01-01T10:00:00.000+00:00",
+        "$updatedAt": "2026-01-01T10:00:00.000+00:00",
+        "shop_id": "benchshop",
+        "customer_id": f"cust{i % 50}",
+        "order_number": f"BENCH-{i:06d}",
+        "source": "storefront",
+        "items": json.dumps([{"product_id": "p1", "product_name": "Rice", "quantity": 2, "unit": "kg", "price": 60, "total": 120}]),
+        "total_amount": 120.0,
+        "gst_amount": 6.0,
+        "status": "pending",
+        "delivery_address": "MG Road",
+    }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers TablesDB list_rows calls after a fixed delay"""
+    latency = 0.05
+    rows = [make_order_row(i) for i in range(25)]
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        body = json.dumps({"total": len(self.rows), "rows": self.rows}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stand_in(latency_ms: int) -> ThreadingHTTPServer:
+    StandInHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_apps():
+    from fastapi import FastAPI
+    from appwrite.query import Query
+    from config.appwrite import tables_db, DATABASE_ID
+    from api import orders
+
+    blocking_app = FastAPI()
+
+    @blocking_app.get("/orders/")
+    async def list_orders_blocking(limit: int = 25):
+        result = tables_db.list_rows(
+            database_id=DATABASE_ID,
+            table_id="orders",
+            queries=[Query.limit(limit)]
+        )
+        return {"total": result["total"], "orders": [orders.Order(**doc) for doc in result["rows"]]}
+
+    async_app = FastAPI()
+    async_app.include_router(orders.router)
+
+    return blocking_app, async_app
+
+
+async def drive(app, total: int, concurrency: int) -> float:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get("/orders/")
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    server = start_stand_in(args.latency_ms)
+    os.environ["APPWRITE_ENDPOINT"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ.setdefault("APPWRITE_DATABASE_ID", "benchdb")
+
+    blocking_app, async_app = build_apps()
+
+    print("=" * 60)
+    print("⚡ APPWRITE CONCURRENCY BENCHMARK")
+    print(f"   Requests: {args.requests}  Concurrency: {args.concurrency}  Stand-in latency: {args.latency_ms}ms")
+    print("=" * 60)
+
+    results = {}
+    for name, app in (("blocking", blocking_app), ("async", async_app)):
+        elapsed = asyncio.run(drive(app, args.requests, args.concurrency))
+        results[name] = args.requests / elapsed
+        print(f"   {name:<9} {elapsed:6.2f}s  {results[name]:8.1f} req/s")
+
+    print(f"\n   Speedup: {results['async'] / results['blocking']:.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
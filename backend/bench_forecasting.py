@@ -0,0 +1,255 @@
+"""
+Backtest and benchmark for demand forecasting.
+
+Generates synthetic shops with per-product trends, weekly seasonality and
+festival spikes, and replays them through the real forecasting path:
+  orders -> daily_sales.accumulate (rollup rows) -> SalesCube -> assemble_forecast
+The 30-day history is forecast and compared to the following 7 days:
+  - MAPE / WAPE of predicted_demand_7d (MAPE over products that sold >= 1)
+  - coverage of prediction_interval_7d
+  - stockout misses: products whose 7-day demand exceeded stock without a
+    reorder recommendation (false alarms = recommended but did not run out)
+  - Brier score of the simulated 7-day stockout probability (simulation mode)
+The old rule-based forecast (30-day average x 7 x 1.1) is scored as a baseline.
+Wall time per phase and the tracemalloc peak of the replay (generated orders
+excluded) are reported per shop. No Appwrite or LLM calls are made.
+
+Usage:
+    python bench_forecasting.py [--orders 1000,10000,100000] [--shops 3] [--products 200]
+                                [--holdout-festival] [--seed 7] [--simulation-paths 500]
+                                [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+os.environ.setdefault("FASTROUTER_API_KEY", "bench")
+
+import numpy as np
+
+from config.settings import settings
+from services.daily_sales import accumulate
+from services.forecasting import assemble_forecast
+from services.sales_cube import SalesCube
+
+HISTORY_DAYS = 30
+HORIZON_DAYS = 7
+START = date(2026, 1, 1)
+CANCEL_RATE = 0.02
+
+
+def demand_intensity(rng: np.random.Generator, n_products: int, holdout_festival: bool) -> np.ndarray:
+    """Relative expected quantity per product per day [products x history + horizon days]"""
+    n_days = HISTORY_DAYS + HORIZON_DAYS
+    t = np.arange(n_days)
+
+    popularity = rng.lognormal(0.0, 1.0, n_products)
+    trend = np.clip(1 + rng.normal(0, 0.01, n_products)[:, None] * t, 0.2, None)
+
+    weekdays = (START.weekday() + t) % 7
+    weekend_lift = rng.uniform(1.1, 1.5)
+    weekly = np.where(weekdays >= 5, weekend_lift, 1.0) * rng.uniform(0.85, 1.15, (n_products, 7))[:, weekdays]
+
+    festival = np.ones((n_products, n_days))
+    festival_days = [int(rng.integers(5, HISTORY_DAYS - 5))]
+    if holdout_festival:
+        festival_days.append(HISTORY_DAYS + int(rng.integers(1, HORIZON_DAYS - 2)))
+    for first in festival_days:
+        festive = rng.random(n_products) < 0.3
+        festival[festive, first:first + 3] *= rng.uniform(2.0, 3.0)
+
+    return popularity[:, None] * trend * weekly * festival
+
+
+def generate_shop(shop_id: str, n_orders: int, n_products: int, seed: int, holdout_festival: bool):
+    """Catalog, inventory, orders (rollup input) and realised demand over the horizon for one synthetic shop"""
+    rng = np.random.default_rng(seed)
+    intensity = demand_intensity(rng, n_products, holdout_festival)
+    n_days = intensity.shape[1]
+
+    product_ids = [f"{shop_id}p{i:05d}" for i in range(n_products)]
+    names = [f"Product {i}" for i in range(n_products)]
+    prices = rng.integers(10, 500, n_products)
+
+    daily_weight = intensity.sum(axis=0)
+    orders_per_day = rng.poisson(n_orders * daily_weight / daily_weight.sum())
+
+    orders, future_qty = [], np.zeros(n_products)
+    for day in range(n_days):
+        count = int(orders_per_day[day])
+        if not count:
+            continue
+        lines_per_order = 1 + rng.poisson(2.0, count)
+        products = rng.choice(n_products, size=int(lines_per_order.sum()), p=intensity[:, day] / intensity[:, day].sum())
+        quantities = 1 + rng.poisson(0.5, len(products))
+        cancelled = rng.random(count) < CANCEL_RATE
+        created_at = f"{(START + timedelta(days=day)).isoformat()}T10:00:00.000+00:00"
+
+        bounds = np.concatenate([[0], np.cumsum(lines_per_order)])
+        for o in range(count):
+            lines = range(bounds[o], bounds[o + 1])
+            status = "cancelled" if cancelled[o] else "delivered"
+            if day < HISTORY_DAYS:
+                orders.append({
+                    "$id": f"{shop_id}o{len(orders):07d}",
+                    "$createdAt": created_at,
+                    "shop_id": shop_id,
+                    "status": status,
+                    "items": json.dumps([{
+                        "product_id": product_ids[products[i]],
+                        "product_name": names[products[i]],
+                        "quantity": int(quantities[i]),
+                        "unit": "pcs",
+                        "price": int(prices[products[i]]),
+                        "total": int(quantities[i] * prices[products[i]])
+                    } for i in lines])
+                })
+            elif not cancelled[o]:
+                np.add.at(future_qty, products[bounds[o]:bounds[o + 1]], quantities[bounds[o]:bounds[o + 1]])
+
+    # Opening stock between ~0.3x and 2x the expected horizon demand, so some products run out
+    expected = intensity[:, HISTORY_DAYS:].sum(axis=1) * future_qty.sum() / intensity[:, HISTORY_DAYS:].sum()
+    stock = np.maximum(1, np.round(expected * rng.uniform(0.3, 2.0, n_products)))
+    catalog = [{"$id": product_ids[i], "name": names[i], "price": int(prices[i])} for i in range(n_products)]
+    inventory = {product_ids[i]: {
+        "shop_id": shop_id,
+        "product_id": product_ids[i],
+        "stock_quantity": float(stock[i]),
+        "min_stock_level": float(max(1, round(expected[i] / HORIZON_DAYS)))
+    } for i in range(n_products)}
+
+    return catalog, inventory, orders, future_qty
+
+
+def replay(shop_id: str, catalog, inventory, orders):
+    """Rollup -> cube -> forecast, timed per phase (ms)"""
+    timings = {}
+    start = time.perf_counter()
+    totals = {}
+    for order in orders:
+        accumulate(totals, order)
+    rows = [{"shop_id": shop, "product_id": product, "date": day, **values} for (shop, product, day), values in totals.items()]
+    timings["rollup_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    cube = SalesCube(shop_id, START, HISTORY_DAYS, rows)
+    timings["cube_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    forecast = assemble_forecast(shop_id, cube, catalog, inventory)
+    timings["forecast_ms"] = (time.perf_counter() - start) * 1000
+    return forecast, cube, timings
+
+
+def peak_memory_mb(shop_id: str, catalog, inventory, orders) -> float:
+    tracemalloc.start()
+    replay(shop_id, catalog, inventory, orders)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def score(predicted: np.ndarray, reorder: np.ndarray, stock: np.ndarray, actual: np.ndarray) -> dict:
+    sold = actual >= 1
+    stocked_out = actual > stock
+    return {
+        "mape": float(np.mean(np.abs(predicted[sold] - actual[sold]) / actual[sold])) if sold.any() else 0.0,
+        "wape": float(np.abs(predicted - actual).sum() / max(actual.sum(), 1)),
+        "stockouts": int(stocked_out.sum()),
+        "stockout_misses": int((stocked_out & ~reorder).sum()),
+        "false_alarms": int((reorder & ~stocked_out).sum()),
+    }
+
+
+def backtest_shop(shop_id: str, n_orders: int, n_products: int, seed: int, holdout_festival: bool) -> dict:
+    catalog, inventory, orders, actual = generate_shop(shop_id, n_orders, n_products, seed, holdout_festival)
+    forecast, cube, timings = replay(shop_id, catalog, inventory, orders)
+    memory = peak_memory_mb(shop_id, catalog, inventory, orders)
+
+    by_id = {p["product_id"]: p for p in forecast["predictions"]}
+    predictions = [by_id[p["$id"]] for p in catalog]
+    predicted = np.array([p["predicted_demand_7d"] for p in predictions])
+    lower = np.array([p["prediction_interval_7d"]["lower"] for p in predictions])
+    upper = np.array([p["prediction_interval_7d"]["upper"] for p in predictions])
+    reorder = np.array([p["reorder_recommended"] for p in predictions])
+    levels = [inventory[p["$id"]] for p in catalog]
+    stock = np.array([level["stock_quantity"] for level in levels])
+    engine = {**score(predicted, reorder, stock, actual), "coverage": float(np.mean((actual >= lower) & (actual <= upper)))}
+    if settings.FORECAST_SIMULATION_PATHS > 0:
+        probability = np.array([p["stockout_probability"]["7d"] for p in predictions])
+        engine["brier_7d"] = float(np.mean((probability - (actual > stock)) ** 2))
+
+    # Baseline: the rule-based forecast the engine replaced
+    matrix, _ = cube.aligned(catalog)
+    baseline = matrix.sum(axis=1) / HISTORY_DAYS * HORIZON_DAYS * 1.1
+    threshold = np.array([level["min_stock_level"] for level in levels])
+
+    return {
+        "shop_id": shop_id,
+        "orders": len(orders),
+        "engine": engine,
+        "baseline": score(baseline, stock - baseline < threshold, stock, actual),
+        "memory_mb": memory,
+        **timings,
+    }
+
+
+def summarize(n_orders: int, shops: list) -> dict:
+    summary = {"orders_per_shop": n_orders, "shops": len(shops)}
+    for model in ("engine", "baseline"):
+        summary[model] = {key: statistics.fmean(s[model][key] for s in shops) for key in shops[0][model]}
+    for key in ("rollup_ms", "cube_ms", "forecast_ms", "memory_mb"):
+        summary[key] = statistics.fmean(s[key] for s in shops)
+    return summary
+
+
+def print_summary(s: dict, products: int):
+    e, b = s["engine"], s["baseline"]
+    print(f"\n{s['orders_per_shop']:,} orders/shop x {s['shops']} shops, {products} products")
+    print(f"  MAPE            engine {e['mape']:6.1%}   baseline {b['mape']:6.1%}")
+    print(f"  WAPE            engine {e['wape']:6.1%}   baseline {b['wape']:6.1%}")
+    print(f"  80% interval    coverage {e['coverage']:.1%}")
+    if "brier_7d" in e:
+        print(f"  stockout P(7d)  Brier {e['brier_7d']:.3f}")
+    print(f"  stockouts       {e['stockouts']:.1f} per shop")
+    print(f"  stockout misses engine {e['stockout_misses']:6.1f}   baseline {b['stockout_misses']:6.1f}")
+    print(f"  false alarms    engine {e['false_alarms']:6.1f}   baseline {b['false_alarms']:6.1f}")
+    print(f"  per shop        rollup {s['rollup_ms']:.1f} ms, cube {s['cube_ms']:.1f} ms, "
+          f"forecast {s['forecast_ms']:.1f} ms, peak {s['memory_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", default="1000,10000,100000", help="comma-separated orders per shop")
+    parser.add_argument("--shops", type=int, default=3)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--holdout-festival", action="store_true", help="also put a festival in the forecast week")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--simulation-paths", type=int, default=settings.FORECAST_SIMULATION_PATHS,
+                        help="Monte Carlo paths (0 = point forecast reorder rule)")
+    parser.add_argument("--json", help="write per-shop results to this file")
+    args = parser.parse_args()
+    settings.FORECAST_SIMULATION_PATHS = args.simulation_paths
+
+    results = []
+    for n_orders in [int(n) for n in args.orders.split(",")]:
+        shops = [
+            backtest_shop(f"bench{n_orders}s{i}", n_orders, args.products, args.seed + i, args.holdout_festival)
+            for i in range(args.shops)
+        ]
+        summary = summarize(n_orders, shops)
+        print_summary(summary, args.products)
+        results.append({**summary, "per_shop": shops})
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
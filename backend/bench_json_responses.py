@@ -0,0 +1,157 @@
+"""
+Serialization microbenchmark for list endpoints.
+
+Serves the same 100-row Order and Delivery pages from two FastAPI endpoints:
+  - default: Model(**row) list returned as a dict (response_model=dict ->
+             FastAPI re-validation + jsonable_encoder + json.dumps)
+  - fast:    validate_rows (one pydantic-core call for the page, see
+             utils/fast_json.py), serialized by FastAPI as usual
+
+Requests go through httpx's ASGITransport, so timings include routing but no
+network or Appwrite latency. The two responses are checked for equal JSON.
+
+On FastAPI 0.143 both paths measure about the same (0.9-1.0x): FastAPI's own
+serialization already goes through pydantic-core. A custom response class that
+skipped it measured 1.4x / 2.0x only on FastAPI 0.128 and was removed rather
+than pinning FastAPI. Re-run after upgrading FastAPI or pydantic.
+
+Usage:
+    python bench_json_responses.py [--rows 100] [--iterations 300]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("FASTROUTER_API_KEY", "bench")
+
+import httpx
+from fastapi import FastAPI
+
+from models.delivery import Delivery
+from models.order import Order
+from utils.fast_json import validate_rows
+
+
+def make_order_row(i: int) -> dict:
+    return {
+        "$id": f"order{i:06d}",
+        "$createdAt": "2026-01-01T10:00:00.000+00:00",
+        "$updatedAt": "2026-01-01T10:05:00.000+00:00",
+        "shop_id": "benchshop",
+        "customer_id": f"cust{i % 50}",
+        "order_number": f"BENCH-{i:06d}",
+        "source": "storefront",
+        "items": json.dumps([
+            {"product_id": f"p{j}", "product_name": f"Product {j}", "quantity": 2,
+             "unit": "kg", "price": 60, "total": 120}
+            for j in range(5)
+        ]),
+        "total_amount": 600.0,
+        "gst_amount": 30.0,
+        "status": "pending",
+        "delivery_address": "12 MG Road, Bengaluru",
+        "notes": "Ring the bell",
+    }
+
+
+def make_delivery_row(i: int) -> dict:
+    stops = [
+        {"order_id": f"order{j:06d}", "customer_name": f"Customer {j}", "address": f"{j} MG Road",
+         "latitude": 12.97 + j / 1000, "longitude": 77.59 + j / 1000, "status": "pending", "sequence": j}
+        for j in range(8)
+    ]
+    return {
+        "$id": f"delivery{i:06d}",
+        "$createdAt": "2026-01-01T10:00:00.000+00:00",
+        "$updatedAt": "2026-01-01T10:05:00.000+00:00",
+        "shop_id": "benchshop",
+        "batch_number": f"B-{i:06d}",
+        "order_ids": json.dumps([s["order_id"] for s in stops]),
+        "area": "MG Road",
+        "crates": json.dumps([{"id": "c1", "capacity": 10, "assigned_order_ids": [s["order_id"] for s in stops]}]),
+        "capacity_used": 8,
+        "route_stops": json.dumps(stops),
+        "route_geometry": json.dumps({
+            "type": "LineString",
+            "coordinates": [[77.59 + k / 10000, 12.97 + k / 10000] for k in range(60)]
+        }),
+        "total_distance": 7.4,
+        "status": "planned",
+        "delivery_partner": json.dumps({"name": "Ravi", "phone": "9999999999", "vehicle": "bike"}),
+        "estimated_time": 45,
+    }
+
+
+def build_app(rows_by_model) -> FastAPI:
+    app = FastAPI()
+
+    def endpoints(model, key, rows):
+        # Closures, not default args - FastAPI would treat those as query params
+        async def default_endpoint():
+            return {"total": len(rows), key: [model(**row) for row in rows], "next_cursor": None}
+
+        async def fast_endpoint():
+            return {"total": len(rows), key: validate_rows(model, rows), "next_cursor": None}
+
+        return default_endpoint, fast_endpoint
+
+    for model, key, rows in rows_by_model:
+        default_endpoint, fast_endpoint = endpoints(model, key, rows)
+        app.add_api_route(f"/default/{key}", default_endpoint, methods=["GET"], response_model=dict)
+        app.add_api_route(f"/fast/{key}", fast_endpoint, methods=["GET"], response_model=dict)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, iterations: int):
+    for _ in range(10):  # warm-up (adapter / schema caches)
+        await client.get(path)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = await client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, response
+
+
+async def run(rows: int, iterations: int):
+    pages = [
+        (Order, "orders", [make_order_row(i) for i in range(rows)]),
+        (Delivery, "deliveries", [make_delivery_row(i) for i in range(rows)]),
+    ]
+    app = build_app(pages)
+    transport = httpx.ASGITransport(app=app)
+
+    print(f"\n{rows}-row pages, {iterations} requests per path\n")
+    print(f"{'page':<12}{'path':<10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'bytes':>10}")
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _, key, _ in pages:
+            results = {}
+            for path in ("default", "fast"):
+                timings, response = await measure(client, f"/{path}/{key}", iterations)
+                results[path] = (timings, response)
+                p95 = statistics.quantiles(timings, n=20)[-1]
+                print(
+                    f"{key:<12}{path:<10}{statistics.mean(timings):>10.2f}"
+                    f"{statistics.median(timings):>10.2f}{p95:>10.2f}{len(response.content):>10}"
+                )
+
+            same = results["default"][1].json() == results["fast"][1].json()
+            speedup = statistics.mean(results["default"][0]) / statistics.mean(results["fast"][0])
+            print(f"{'':<12}{'speedup':<10}{speedup:>9.1f}x   identical JSON: {same}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List endpoint serialization benchmark")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-from appwrite.client import Client
 from appwrite.services.databases import Databases
 from appwrite.services.tables_db import TablesDB
 from appwrite.services.storage import Storage
@@ -6,17 +5,30 @@ from appwrite.services.users import Users
 import os
 from dotenv import load_dotenv
 
+from config.transport import PooledClient
+
 load_dotenv()
 
 # Initialize Appwrite client
 APPWRITE_ENDPOINT = os.getenv('APPWRITE_ENDPOINT', 'https://cloud.appwrite.io/v1')
 APPWRITE_PROJECT_ID = os.getenv('APPWRITE_PROJECT_ID', '')
 
-client = Client()
+client = PooledClient()
 client.set_endpoint(APPWRITE_ENDPOINT)
 client.set_project(APPWRITE_PROJECT_ID)
 client.set_key(os.getenv('APPWRITE_API_KEY', ''))
 
+
+def create_session_client(session_id: str = None) -> PooledClient:
+    """Per-user client (no API key) that shares the admin client's connection pool"""
+    user_client = PooledClient()
+    user_client.set_endpoint(APPWRITE_ENDPOINT)
+    user_client.set_project(APPWRITE_PROJECT_ID)
+    if session_id:
+        user_client.set_session(session_id)
+    return user_client
+
+
 # Initialize services
 databases = Databases(client)
 tables_db = TablesDB(client)
@@ -9,7 +9,49 @@ class Settings:
     APPWRITE_PROJECT_ID = os.getenv('APPWRITE_PROJECT_ID', '')
     APPWRITE_API_KEY = os.getenv('APPWRITE_API_KEY', '')
     APPWRITE_DATABASE_ID = os.getenv('APPWRITE_DATABASE_ID', '')
-    
+    APPWRITE_MAX_WORKERS = int(os.getenv('APPWRITE_MAX_WORKERS', '32'))
+    APPWRITE_POOL_SIZE = int(os.getenv('APPWRITE_POOL_SIZE', '32'))
+    APPWRITE_KEEPALIVE_EXPIRY = float(os.getenv('APPWRITE_KEEPALIVE_EXPIRY', '30'))
+    APPWRITE_CONNECT_TIMEOUT = float(os.getenv('APPWRITE_CONNECT_TIMEOUT', '5'))
+    APPWRITE_READ_TIMEOUT = float(os.getenv('APPWRITE_READ_TIMEOUT', '30'))
+    # Opt-in: needs the h2 package (pip install httpx[http2]), which is not a dependency
+    APPWRITE_HTTP2 = os.getenv('APPWRITE_HTTP2', 'False') == 'True'
+
+    # Appwrite resilience (per-attempt deadlines, retries for reads, circuit breaker)
+    APPWRITE_READ_DEADLINE = float(os.getenv('APPWRITE_READ_DEADLINE', '5'))
+    APPWRITE_WRITE_DEADLINE = float(os.getenv('APPWRITE_WRITE_DEADLINE', '10'))
+    APPWRITE_RETRY_ATTEMPTS = int(os.getenv('APPWRITE_RETRY_ATTEMPTS', '3'))
+    APPWRITE_RETRY_BASE_DELAY = float(os.getenv('APPWRITE_RETRY_BASE_DELAY', '0.1'))
+    APPWRITE_RETRY_MAX_DELAY = float(os.getenv('APPWRITE_RETRY_MAX_DELAY', '1'))
+    APPWRITE_BREAKER_THRESHOLD = int(os.getenv('APPWRITE_BREAKER_THRESHOLD', '5'))
+    APPWRITE_BREAKER_RESET = float(os.getenv('APPWRITE_BREAKER_RESET', '30'))
+
+    # Caching
+    CATALOG_CACHE_TTL = float(os.getenv('CATALOG_CACHE_TTL', '300'))
+    CATALOG_CACHE_MAX_SHOPS = int(os.getenv('CATALOG_CACHE_MAX_SHOPS', '1000'))
+    FORECAST_CACHE_TTL = float(os.getenv('FORECAST_CACHE_TTL', '900'))
+    FORECAST_CACHE_MAX_ENTRIES = int(os.getenv('FORECAST_CACHE_MAX_ENTRIES', '1000'))
+    SALES_CUBE_TTL = float(os.getenv('SALES_CUBE_TTL', '900'))
+    SALES_CUBE_MAX_SHOPS = int(os.getenv('SALES_CUBE_MAX_SHOPS', '256'))
+    # Nightly forecasts (precompute_forecasts.py) are served until this old (seconds)
+    FORECAST_PRECOMPUTE_MAX_AGE = float(os.getenv('FORECAST_PRECOMPUTE_MAX_AGE', '93600'))
+    # AI forecast insights are generated in the background and cached per shop
+    AI_INSIGHTS_TTL = float(os.getenv('AI_INSIGHTS_TTL', '3600'))
+    AI_INSIGHTS_RETRY = float(os.getenv('AI_INSIGHTS_RETRY', '60'))
+
+    # Forecast simulation: Monte Carlo stockout probabilities and service-level reorders (0 paths = off)
+    FORECAST_SIMULATION_PATHS = int(os.getenv('FORECAST_SIMULATION_PATHS', '500'))
+    FORECAST_SERVICE_LEVEL = float(os.getenv('FORECAST_SERVICE_LEVEL', '0.95'))
+
+    # Response compression (brotli is used when the `brotli` package is installed)
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+    COMPRESSION_CONTENT_TYPES = os.getenv(
+        'COMPRESSION_CONTENT_TYPES', 'application/json,application/geo+json,text/plain,text/csv,text/html'
+    ).split(',')
+    COMPRESSION_EXCLUDE_PATHS = os.getenv('COMPRESSION_EXCLUDE_PATHS', '/twilio,/telegram').split(',')
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+
     # FastRouter AI
     FASTROUTER_API_KEY = os.getenv('FASTROUTER_API_KEY', '')
     
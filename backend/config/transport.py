@@ -0,0 +1,206 @@
+"""
+Shared HTTP transport for Appwrite clients
+One pooled, keep-alive connection pool reused by the admin client and per-session clients
+"""
+import importlib.util
+import json
+import sys
+import threading
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, Dict
+
+import httpx
+from appwrite.client import Client
+from appwrite.encoders.value_class_encoder import ValueClassEncoder
+from appwrite.exception import AppwriteException
+from appwrite.input_file import InputFile
+
+from config.settings import settings
+
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class PooledTransport:
+    """
+    Thread-safe httpx connection pool with saturation metrics.
+    A semaphore sized to the pool tracks how long callers wait for a free connection.
+    Cookies are never stored: the pool is shared by the admin client and every
+    user's session client, so a session cookie set for one user (e.g. by
+    create_email_password_session) would otherwise be sent on everyone's requests.
+    """
+
+    def __init__(
+        self,
+        pool_size: int,
+        keepalive_expiry: float,
+        connect_timeout: float,
+        read_timeout: float,
+        http2: bool = False
+    ):
+        self.pool_size = pool_size
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            print("⚠️  APPWRITE_HTTP2 is set but h2 is not installed (pip install httpx[http2]); using HTTP/1.1")
+        self._client = httpx.Client(
+            http2=self.http2,
+            # A policy that allows no domain refuses every Set-Cookie
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=httpx.Timeout(
+                read_timeout,
+                connect=connect_timeout,
+                pool=read_timeout
+            )
+        )
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._requests_total = 0
+        self._waits_total = 0
+        self._wait_seconds_total = 0.0
+        self._max_wait_seconds = 0.0
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, blocking until a pooled connection slot is free"""
+        waited = 0.0
+        if not self._slots.acquire(blocking=False):
+            start = time.perf_counter()
+            self._slots.acquire()
+            waited = time.perf_counter() - start
+
+        with self._lock:
+            self._in_flight += 1
+            self._requests_total += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            if waited:
+                self._waits_total += 1
+                self._wait_seconds_total += waited
+                self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+        try:
+            return self._client.request(method, url, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool saturation metrics for sizing APPWRITE_POOL_SIZE"""
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "http2": self.http2,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "utilization": round(self._in_flight / self.pool_size, 3),
+                "requests_total": self._requests_total,
+                "waits_total": self._waits_total,
+                "wait_seconds_total": round(self._wait_seconds_total, 4),
+                "max_wait_seconds": round(self._max_wait_seconds, 4),
+            }
+
+    def close(self):
+        self._client.close()
+
+
+transport = PooledTransport(
+    pool_size=settings.APPWRITE_POOL_SIZE,
+    keepalive_expiry=settings.APPWRITE_KEEPALIVE_EXPIRY,
+    connect_timeout=settings.APPWRITE_CONNECT_TIMEOUT,
+    read_timeout=settings.APPWRITE_READ_TIMEOUT,
+    http2=settings.APPWRITE_HTTP2
+)
+
+
+class PooledClient(Client):
+    """
+    Appwrite Client that sends requests over the shared transport.
+    Mirrors Client.call from the SDK, which otherwise opens a new connection per request.
+    """
+
+    def __init__(self, pool: PooledTransport = transport):
+        super().__init__()
+        self._pool = pool
+
+    def call(self, method, path='', headers=None, params=None, response_type='json'):
+        if headers is None:
+            headers = {}
+
+        if params is None:
+            params = {}
+
+        data = {}
+        files = {}
+        stringify = False
+
+        headers = {**self._global_headers, **headers}
+
+        if method != 'get':
+            data = params
+            params = {}
+
+        if headers['content-type'].startswith('application/json'):
+            data = json.dumps(data, cls=ValueClassEncoder)
+
+        if headers['content-type'].startswith('multipart/form-data'):
+            del headers['content-type']
+            stringify = True
+            for key in data.copy():
+                if isinstance(data[key], InputFile):
+                    files[key] = (data[key].filename, data[key].data)
+                    del data[key]
+            data = self.flatten(data, stringify=stringify)
+
+        body = {}
+        if isinstance(data, str):
+            body['content'] = data
+        elif data:
+            body['data'] = data
+        if files:
+            body['files'] = files
+
+        response = None
+        try:
+            response = self._pool.request(
+                method.upper(),
+                self._endpoint + path,
+                params=self.flatten(params, stringify=stringify),
+                headers=headers,
+                follow_redirects=response_type != 'location',
+                **body
+            )
+
+            if response.is_error:
+                response.raise_for_status()
+
+            warnings = response.headers.get('x-appwrite-warning')
+            if warnings:
+                for warning in warnings.split(';'):
+                    print(f'Warning: {warning}', file=sys.stderr)
+
+            content_type = response.headers.get('Content-Type', '')
+
+            if response_type == 'location':
+                return response.headers.get('Location')
+
+            if content_type.startswith('application/json'):
+                return response.json()
+
+            return response.content
+        except Exception as e:
+            if response is not None:
+                content_type = response.headers.get('Content-Type', '')
+                if content_type.startswith('application/json'):
+                    raise AppwriteException(response.json()['message'], response.status_code, response.json().get('type'), response.text)
+                else:
+                    raise AppwriteException(response.text, response.status_code, None, response.text)
+            else:
+                raise AppwriteException(e)
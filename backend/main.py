@@ -1,10 +1,22 @@
 """
 StoreStorm FastAPI Backend
 """
+import math
+
 from fastapi import FastAPI, Request
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from config.settings import settings
+from config.transport import transport
+from middleware.compression import CompressionMiddleware, compression_stats
+from services.catalog_cache import catalog_cache
+from services.forecast_cache import forecast_cache
+from services.forecast_insights import forecast_insights
+from services.sales_cube import sales_cube_cache
+from services.single_flight import single_flight
+from services.resilience import CircuitOpenError, appwrite_policy, unavailable_error
 
 # Import routers
 from api import shops, products, inventory, customers, orders, deliveries, gst_reports, auth, ai, twilio, telegram, forecasting
@@ -24,8 +36,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON payloads (order lists, route geometry, forecasts); webhooks are excluded
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    content_types=settings.COMPRESSION_CONTENT_TYPES,
+    exclude_paths=settings.COMPRESSION_EXCLUDE_PATHS,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+def unavailable_response(error) -> JSONResponse:
+    """503 (circuit open) / 504 (deadline) with Retry-After, so clients back off instead of seeing a 500"""
+    retry_after = math.ceil(error.retry_in) if isinstance(error, CircuitOpenError) else 1
+    return JSONResponse(
+        status_code=error.code,
+        content={"detail": str(error)},
+        headers={"Retry-After": str(max(1, retry_after))}
+    )
+
+
+@app.exception_handler(StarletteHTTPException)
+async def appwrite_unavailable_handler(request: Request, exc: StarletteHTTPException):
+    # Routers turn AppwriteException into 400/500; pass Appwrite outages through instead
+    error = unavailable_error(exc)
+    if error:
+        return unavailable_response(error)
+    return await http_exception_handler(request, exc)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
+    error = unavailable_error(exc)
+    if error:
+        return unavailable_response(error)
     import traceback
     print(f"🔥 GLOBAL ERROR: {exc}")
     traceback.print_exc()
@@ -69,6 +113,21 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for capacity planning (connection pool, caches, request coalescing, circuit breaker, compression)"""
+    return {
+        "appwrite_pool": transport.stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "forecast_cache": forecast_cache.stats(),
+        "forecast_insights": forecast_insights.stats(),
+        "sales_cube": sales_cube_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "appwrite_resilience": appwrite_policy.stats(),
+        "compression": compression_stats.stats()
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,211 @@
+"""
+Response compression middleware
+gzip (or brotli when installed and accepted) for large JSON/text responses, with bytes-saved metrics
+"""
+import threading
+import zlib
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+BROTLI_AVAILABLE = brotli is not None
+
+
+class CompressionStats:
+    """Thread-safe counters for /metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.compressed: Dict[str, int] = {}
+        self.skipped: Dict[str, int] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record_compressed(self, encoding: str, bytes_in: int, bytes_out: int):
+        with self._lock:
+            self.compressed[encoding] = self.compressed.get(encoding, 0) + 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    def record_skipped(self, reason: str):
+        with self._lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "brotli_available": BROTLI_AVAILABLE,
+                "compressed": dict(self.compressed),
+                "skipped": dict(self.skipped),
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+                "ratio": round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None
+            }
+
+
+compression_stats = CompressionStats()
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """'br' if brotli is installed and accepted, else 'gzip' if accepted (q=0 means refused)"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    if BROTLI_AVAILABLE and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental gzip / brotli stream so streamed responses compress chunk by chunk"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._stream = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._stream.process
+            self._flush = self._stream.flush
+            self._finish = self._stream.finish
+        else:
+            # wbits=31 -> gzip container, same as gzip.compress
+            self._stream = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._compress = self._stream.compress
+            self._flush = lambda: self._stream.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._stream.flush
+
+    def compress(self, data: bytes, more_body: bool) -> bytes:
+        out = self._compress(data)
+        # Flush each chunk of a stream so the client is not left waiting on buffered output
+        return out + (self._flush() if more_body else self._finish())
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware (works with streaming responses, unlike BaseHTTPMiddleware).
+
+    A response is compressed when the client accepts gzip/br, its content type is in the
+    allowlist, it is not already encoded, its path is not excluded (Twilio/Telegram
+    webhooks answer tiny TwiML/JSON that the caller reads immediately), and a complete
+    body is at least `minimum_size` bytes. Streamed bodies are always compressed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = ("application/json",),
+        exclude_paths: Iterable[str] = (),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        stats: CompressionStats = compression_stats
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = {t.strip().lower() for t in content_types if t.strip()}
+        self.exclude_paths = tuple(p.strip() for p in exclude_paths if p.strip())
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self.exclude_paths and scope["path"].startswith(self.exclude_paths):
+            self.stats.record_skipped("excluded_path")
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            self.stats.record_skipped("not_accepted")
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponder(self, encoding, send)(self.app, scope, receive)
+
+
+class _CompressedResponder:
+    """Per-request state: holds http.response.start until the first body chunk decides"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def __call__(self, app: ASGIApp, scope: Scope, receive: Receive):
+        await app(scope, receive, self.send_wrapper)
+
+    def skip_reason(self, headers: Headers, body: bytes, more_body: bool) -> Optional[str]:
+        if "content-encoding" in headers:
+            return "already_encoded"
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type not in self.middleware.content_types:
+            return "content_type"
+        if not more_body and len(body) < self.middleware.minimum_size:
+            return "below_minimum"
+        return None
+
+    async def send_wrapper(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            reason = self.skip_reason(headers, body, more_body)
+            if reason:
+                self.middleware.stats.record_skipped(reason)
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = self.compressor.compress(body, more_body=False)
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                self.middleware.stats.record_compressed(self.encoding, len(body), len(compressed))
+                return
+            await self.send(self.start_message)
+
+        compressed = self.compressor.compress(body, more_body)
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+        if not more_body:
+            self.middleware.stats.record_compressed(self.encoding, self.bytes_in, self.bytes_out)
@@ -0,0 +1,350 @@
+"""
+Schema Migration Runner
+Applies versioned schema changes to an existing database without recreating tables,
+and diffs the live schema against the declared one (COLLECTIONS in setup_database.py).
+
+    python migrate.py status            # applied / pending versions
+    python migrate.py up [--dry-run]    # apply pending migrations in order
+    python migrate.py diff              # live schema vs declared schema
+
+Every operation checks the live schema first, so re-running a migration
+(or running one against a database that already has the change) is a no-op.
+Data steps only rewrite rows whose value is wrong, so they are safe to re-run too.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+
+from appwrite.exception import AppwriteException
+from appwrite.query import Query
+
+from setup_database import COLLECTIONS, tables_db, create_collection, create_column, create_index
+from config.appwrite import DATABASE_ID
+
+
+# (version, description, operations). Operations name columns / indexes / tables
+# declared in COLLECTIONS, which stays the single source of truth for definitions;
+# "backfill" runs the DATA_STEPS entry for a column once it is available.
+# Append only - never edit or reorder a migration that has shipped.
+MIGRATIONS = [
+    (1, "inventory.is_low_stock flag for indexed low-stock listing", [
+        ("add_column", "inventory", "is_low_stock"),
+        ("backfill", "inventory", "is_low_stock"),
+        ("add_index", "inventory", "shop_low_stock_idx"),
+    ]),
+    # 2 (order_items table) was withdrawn: daily_sales serves per-product sales
+    (3, "compound indexes for hot list/filter query shapes", [
+        ("add_index", "products", "shop_active_idx"),
+        ("add_index", "products", "shop_category_idx"),
+        ("add_index", "customers", "shop_phone_idx"),
+        ("add_index", "orders", "shop_created_idx"),
+        ("add_index", "orders", "shop_status_created_idx"),
+        ("add_index", "orders", "customer_created_idx"),
+        ("add_index", "deliveries", "shop_status_created_idx"),
+        ("add_index", "gst_reports", "shop_period_idx"),
+    ]),
+    (4, "daily_sales rollup table", [
+        ("create_table", "daily_sales"),
+    ]),
+    (5, "ai_insights table for precomputed forecasts", [
+        ("create_table", "ai_insights"),
+    ]),
+]
+
+MIGRATIONS_TABLE = "schema_migrations"
+MIGRATIONS_SCHEMA = {
+    'name': 'Schema Migrations',
+    'attributes': [
+        {'key': 'version', 'type': 'integer', 'required': True},
+        {'key': 'description', 'type': 'string', 'size': 255, 'required': True},
+        {'key': 'applied_at', 'type': 'datetime', 'required': True},
+    ],
+    'indexes': [
+        {'key': 'version_idx', 'type': 'unique', 'attributes': ['version']},
+    ]
+}
+
+# Appwrite builds columns and indexes asynchronously
+READY_TIMEOUT = 120
+SYSTEM_COLUMNS = {'$id', '$createdAt', '$updatedAt'}
+
+
+def is_not_found(e):
+    return e.code == 404 or 'not found' in str(e).lower()
+
+
+def declared_column(table_id, key):
+    return next(a for a in COLLECTIONS[table_id]['attributes'] if a['key'] == key)
+
+
+def declared_index(table_id, key):
+    return next(i for i in COLLECTIONS[table_id]['indexes'] if i['key'] == key)
+
+
+def live_schema(table_id):
+    """(columns by key, indexes by key) for a live table, or None if it does not exist"""
+    try:
+        tables_db.get_table(database_id=DATABASE_ID, table_id=table_id)
+    except AppwriteException as e:
+        if is_not_found(e):
+            return None
+        raise
+    columns = tables_db.list_columns(
+        database_id=DATABASE_ID, table_id=table_id, queries=[Query.limit(100)]
+    )['columns']
+    indexes = tables_db.list_indexes(
+        database_id=DATABASE_ID, table_id=table_id, queries=[Query.limit(100)]
+    )['indexes']
+    return {c['key']: c for c in columns}, {i['key']: i for i in indexes}
+
+
+def wait_until_available(fetch, label):
+    deadline = time.monotonic() + READY_TIMEOUT
+    while True:
+        status = fetch().get('status')
+        if status == 'available':
+            return
+        if status in ('failed', 'stuck'):
+            raise RuntimeError(f"{label} is {status}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{label} still {status} after {READY_TIMEOUT}s")
+        time.sleep(1)
+
+
+def wait_for_column(table_id, key):
+    if key in SYSTEM_COLUMNS:
+        return
+    wait_until_available(
+        lambda: tables_db.get_column(database_id=DATABASE_ID, table_id=table_id, key=key),
+        f"column {table_id}.{key}"
+    )
+
+
+# --- Operations: each returns a short description of what it did (or would do) ---
+
+def op_create_table(table_id, dry_run):
+    if live_schema(table_id) is not None:
+        return "exists"
+    if dry_run:
+        return "would create"
+    create_collection(DATABASE_ID, table_id, COLLECTIONS[table_id])
+    return "created"
+
+
+def op_add_column(table_id, key, dry_run):
+    try:
+        tables_db.get_column(database_id=DATABASE_ID, table_id=table_id, key=key)
+        return "exists"
+    except AppwriteException as e:
+        if not is_not_found(e):
+            raise
+    if dry_run:
+        return "would add"
+    create_column(DATABASE_ID, table_id, declared_column(table_id, key))
+    wait_for_column(table_id, key)
+    return "added"
+
+
+def op_add_index(table_id, key, dry_run):
+    idx = declared_index(table_id, key)
+    try:
+        live = tables_db.get_index(database_id=DATABASE_ID, table_id=table_id, key=key)
+        if live.get('columns') != idx['attributes']:
+            raise RuntimeError(
+                f"index {table_id}.{key} exists on {live.get('columns')}, declared {idx['attributes']}"
+            )
+        return "exists"
+    except AppwriteException as e:
+        if not is_not_found(e):
+            raise
+    if dry_run:
+        return "would add"
+    for column in idx['attributes']:
+        wait_for_column(table_id, column)
+    create_index(DATABASE_ID, table_id, idx)
+    wait_until_available(
+        lambda: tables_db.get_index(database_id=DATABASE_ID, table_id=table_id, key=key),
+        f"index {table_id}.{key}"
+    )
+    return "added"
+
+
+# --- Data steps: async, through the app's repository client; return rows updated ---
+
+async def backfill_low_stock():
+    """Recompute inventory.is_low_stock (stock_quantity <= min_stock_level) on every row"""
+    # Imported here so status / diff don't need the app's settings
+    from models.inventory import is_low_stock
+    from services.repository import db
+
+    updated = 0
+    queries = [Query.select(['stock_quantity', 'min_stock_level', 'is_low_stock'])]
+    async for row in db.iter_rows(DATABASE_ID, 'inventory', queries):
+        flag = is_low_stock(row['stock_quantity'], row['min_stock_level'])
+        if row.get('is_low_stock') != flag:
+            await db.update_row(DATABASE_ID, 'inventory', row['$id'], {'is_low_stock': flag})
+            updated += 1
+    return updated
+
+
+DATA_STEPS = {
+    ("inventory", "is_low_stock"): backfill_low_stock,
+}
+
+
+def op_backfill(table_id, key, dry_run):
+    if dry_run:
+        return "would backfill"
+    # The column may still be building if it was added by an earlier, interrupted run
+    wait_for_column(table_id, key)
+    updated = asyncio.run(DATA_STEPS[(table_id, key)]())
+    return f"updated {updated} rows"
+
+
+OPERATIONS = {
+    "create_table": op_create_table,
+    "add_column": op_add_column,
+    "add_index": op_add_index,
+    "backfill": op_backfill,
+}
+
+
+# --- Bookkeeping ---
+
+def ensure_migrations_table():
+    if live_schema(MIGRATIONS_TABLE) is None:
+        create_collection(DATABASE_ID, MIGRATIONS_TABLE, MIGRATIONS_SCHEMA)
+
+
+def applied_versions():
+    try:
+        rows = tables_db.list_rows(
+            database_id=DATABASE_ID,
+            table_id=MIGRATIONS_TABLE,
+            queries=[Query.limit(1000)]
+        )['rows']
+    except AppwriteException as e:
+        if is_not_found(e):
+            return {}
+        raise
+    return {row['version']: row for row in rows}
+
+
+def record(version, description):
+    tables_db.upsert_row(
+        database_id=DATABASE_ID,
+        table_id=MIGRATIONS_TABLE,
+        row_id=f"v{version:04d}",
+        data={
+            'version': version,
+            'description': description,
+            'applied_at': datetime.now(timezone.utc).isoformat()
+        }
+    )
+
+
+# --- Commands ---
+
+def cmd_status():
+    applied = applied_versions()
+    print("\n📜 Migrations:\n")
+    for version, description, _ in MIGRATIONS:
+        row = applied.get(version)
+        mark = f"✅ applied {row['applied_at'][:19]}" if row else "⏳ pending"
+        print(f"  {version:04d}  {mark}  {description}")
+    print()
+
+
+def cmd_up(dry_run=False):
+    if not dry_run:
+        ensure_migrations_table()
+    applied = applied_versions()
+    pending = [m for m in MIGRATIONS if m[0] not in applied]
+    if not pending:
+        print("\n✅ Schema is up to date\n")
+        return
+
+    for version, description, operations in pending:
+        print(f"\n🚀 {version:04d} {description}")
+        for name, *args in operations:
+            result = OPERATIONS[name](*args, dry_run=dry_run)
+            print(f"    • {name} {'.'.join(args)}: {result}")
+        if not dry_run:
+            record(version, description)
+            print(f"  ✅ Applied {version:04d}")
+    print()
+
+
+def cmd_diff():
+    """Print differences; returns the number found (exit code for CI)"""
+    differences = 0
+
+    def report(message):
+        nonlocal differences
+        differences += 1
+        print(f"  ❌ {message}")
+
+    print("\n🔍 Live schema vs declared schema:\n")
+    for table_id, schema in COLLECTIONS.items():
+        live = live_schema(table_id)
+        if live is None:
+            report(f"{table_id}: table missing")
+            continue
+        live_columns, live_indexes = live
+
+        for attr in schema['attributes']:
+            column = live_columns.get(attr['key'])
+            if column is None:
+                report(f"{table_id}.{attr['key']}: column missing")
+                continue
+            if column['type'] != attr['type']:
+                report(f"{table_id}.{attr['key']}: type {column['type']}, declared {attr['type']}")
+            if column.get('required') != attr['required']:
+                report(f"{table_id}.{attr['key']}: required={column.get('required')}, declared {attr['required']}")
+            if attr['type'] == 'string' and column.get('size') != attr['size']:
+                report(f"{table_id}.{attr['key']}: size {column.get('size')}, declared {attr['size']}")
+            if column.get('status') != 'available':
+                report(f"{table_id}.{attr['key']}: status {column.get('status')}")
+        for key in live_columns.keys() - {a['key'] for a in schema['attributes']}:
+            report(f"{table_id}.{key}: column not declared")
+
+        for idx in schema.get('indexes', []):
+            index = live_indexes.get(idx['key'])
+            if index is None:
+                report(f"{table_id}: index {idx['key']} missing")
+            elif index.get('columns') != idx['attributes'] or index.get('type') != idx['type']:
+                report(
+                    f"{table_id}: index {idx['key']} is {index.get('type')} {index.get('columns')}, "
+                    f"declared {idx['type']} {idx['attributes']}"
+                )
+        for key in live_indexes.keys() - {i['key'] for i in schema.get('indexes', [])}:
+            report(f"{table_id}: index {key} not declared")
+
+    if differences:
+        print(f"\n⚠️  {differences} difference(s)\n")
+    else:
+        print("  ✅ No differences\n")
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StoreStorm schema migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Show applied and pending migrations")
+    up = sub.add_parser("up", help="Apply pending migrations")
+    up.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    sub.add_parser("diff", help="Diff live schema against COLLECTIONS")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        cmd_status()
+    elif args.command == "up":
+        cmd_up(dry_run=args.dry_run)
+    elif args.command == "diff":
+        sys.exit(1 if cmd_diff() else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,3 +5,4 @@ from .customer import Customer
 from .order import Order, OrderItem
 from .delivery import Delivery
 from .gst import GSTReport
+from .batch import BatchGetRequest
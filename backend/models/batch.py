@@ -0,0 +1,6 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+class BatchGetRequest(BaseModel):
+    """Body for POST /<resource>/batch-get"""
+    ids: List[str] = Field(..., min_length=1, max_length=500)
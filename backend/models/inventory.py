@@ -2,6 +2,9 @@ from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field
 
+def is_low_stock(stock_quantity: float, min_stock_level: float) -> bool:
+    return stock_quantity <= min_stock_level
+
 class Inventory(BaseModel):
     id: Optional[str] = Field(None, alias="$id")
     shop_id: str
@@ -9,6 +12,7 @@ class Inventory(BaseModel):
     stock_quantity: float
     min_stock_level: float
     last_restock_date: Optional[datetime] = None
+    is_low_stock: bool = False  # maintained on every write, indexed for low-stock queries
     created_at: Optional[datetime] = Field(None, alias="$createdAt")
     updated_at: Optional[datetime] = Field(None, alias="$updatedAt")
 
@@ -0,0 +1,57 @@
+"""
+Precompute demand forecasts for all active shops
+Run nightly so morning dashboard traffic is served from ai_insights instead of computing live.
+
+    python precompute_forecasts.py                    # every active shop
+    python precompute_forecasts.py --shop <shop_id>   # repeatable
+    python precompute_forecasts.py --workers 8
+
+    # crontab: 02:30 every night
+    30 2 * * * cd /app/backend && uv run python precompute_forecasts.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from services.forecast_precompute import list_active_shops, run_precompute
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shop", action="append", help="Only this shop_id (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    args = parser.parse_args()
+
+    shop_ids = args.shop or asyncio.run(list_active_shops())
+    print(f"\n🔮 Precomputing forecasts for {len(shop_ids)} shops on {args.workers} workers\n")
+
+    start = time.perf_counter()
+    reports = []
+    for report in run_precompute(shop_ids, args.workers):
+        reports.append(report)
+        if report["status"] == "ok":
+            print(
+                f"  ✅ {report['shop_id']}: {report['total_ms']:.0f} ms "
+                f"(compute {report['compute_ms']:.0f} ms, {report['products']} products, {report['orders']} orders)"
+            )
+        else:
+            print(f"  ❌ {report['shop_id']}: {report['error']} ({report['total_ms']:.0f} ms)")
+    wall = time.perf_counter() - start
+
+    ok = [r["total_ms"] for r in reports if r["status"] == "ok"]
+    failed = len(reports) - len(ok)
+    print(f"\n✅ {len(ok)} stored, {failed} failed in {wall:.1f}s")
+    if len(ok) >= 2:
+        p95 = statistics.quantiles(ok, n=20)[-1]
+        print(f"   per shop: p50 {statistics.median(ok):.0f} ms, p95 {p95:.0f} ms, max {max(ok):.0f} ms")
+        slowest = sorted((r for r in reports if r["status"] == "ok"), key=lambda r: -r["total_ms"])[:5]
+        print("   slowest: " + ", ".join(f"{r['shop_id']} ({r['total_ms']:.0f} ms)" for r in slowest))
+    print()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
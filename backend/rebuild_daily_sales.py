@@ -0,0 +1,29 @@
+"""
+Rebuild the daily_sales rollup from orders
+Use to backfill after migration 0004, or to repair drift after failed incremental updates.
+
+    python rebuild_daily_sales.py                # every shop
+    python rebuild_daily_sales.py --shop <shop_id>
+"""
+import argparse
+import asyncio
+
+from config.appwrite import DATABASE_ID
+from services.daily_sales import rebuild_daily_sales
+from setup_database import COLLECTIONS, create_collection
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shop", help="Only rebuild this shop_id")
+    args = parser.parse_args()
+
+    print("\n🔧 Rebuilding daily_sales\n")
+    create_collection(DATABASE_ID, "daily_sales", COLLECTIONS["daily_sales"])
+
+    stats = asyncio.run(rebuild_daily_sales(shop_id=args.shop))
+    print(f"\n✅ Orders: {stats['orders']}, rollup rows: {stats['rows']}, stale rows deleted: {stats['deleted']}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """
 AI Service using FastRouter API with Gemini 2.0 Flash Lite
 """
+import asyncio
 from openai import OpenAI
 from config.settings import settings
 import json
@@ -25,7 +26,9 @@ class AIService:
     async def generate(self, prompt: str, temperature: float = 0.5) -> str:
         """Generate AI response for a prompt"""
         try:
-            completion = self.client.chat.completions.create(
+            # The client is synchronous; run it off the event loop
+            completion = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature
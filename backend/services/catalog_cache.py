@@ -0,0 +1,107 @@
+"""
+Product Catalog Cache
+In-process, per-shop product cache shared by ordering, forecasting and AI parsing
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from appwrite.exception import AppwriteException
+from appwrite.query import Query
+
+from config.appwrite import DATABASE_ID
+from config.settings import settings
+from services.repository import db
+from services.single_flight import single_flight
+
+
+class CatalogCache:
+    """
+    TTL + LRU cache of product rows keyed by shop_id.
+    Entries are read-only lists shared between callers - do not mutate them.
+    Product writes call invalidate() so the next read reloads from Appwrite.
+    """
+
+    def __init__(self, ttl_seconds: float, max_shops: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_shops = max_shops
+        self._entries: "OrderedDict[str, tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        # Bumped on invalidation so a load that raced with a write is not stored
+        self._versions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get(self, shop_id: str) -> List[Dict[str, Any]]:
+        """Return the shop's products, loading from Appwrite on miss or expiry"""
+        entry = self._entries.get(shop_id)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(shop_id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        version = self._versions.get(shop_id, 0)
+        # Concurrent misses for the same shop share one Appwrite scan
+        products = await single_flight.do(("catalog", shop_id), self._load, shop_id)
+
+        if self._versions.get(shop_id, 0) == version:
+            self._entries[shop_id] = (time.monotonic() + self.ttl_seconds, products)
+            self._entries.move_to_end(shop_id)
+            while len(self._entries) > self.max_shops:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return products
+
+    async def _load(self, shop_id: str) -> List[Dict[str, Any]]:
+        queries = [Query.equal("shop_id", shop_id)]
+        return [product async for product in db.iter_rows(DATABASE_ID, "products", queries)]
+
+    async def get_product(self, shop_id: str, product_id: str) -> Optional[Dict[str, Any]]:
+        """
+        One product of a shop: from the cached catalog when it is loaded, otherwise a
+        single row read (the catalog is not loaded for it). None if missing.
+        """
+        entry = self._entries.get(shop_id)
+        if entry and entry[0] > time.monotonic():
+            return next((p for p in entry[1] if p.get("$id") == product_id), None)
+        try:
+            product = await db.get_row(DATABASE_ID, "products", product_id)
+        except AppwriteException as e:
+            if e.code == 404:
+                return None
+            raise
+        return product if product.get("shop_id") == shop_id else None
+
+    def invalidate(self, shop_id: str):
+        """Drop one shop's catalog (call after any product write for that shop)"""
+        self._versions[shop_id] = self._versions.get(shop_id, 0) + 1
+        self._entries.pop(shop_id, None)
+        self.invalidations += 1
+
+    def invalidate_product(self, product_id: str) -> Optional[str]:
+        """Drop whichever cached catalog holds `product_id`; returns its shop_id"""
+        for shop_id, (_, products) in list(self._entries.items()):
+            if any(p.get("$id") == product_id for p in products):
+                self.invalidate(shop_id)
+                return shop_id
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "shops_cached": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+catalog_cache = CatalogCache(
+    ttl_seconds=settings.CATALOG_CACHE_TTL,
+    max_shops=settings.CATALOG_CACHE_MAX_SHOPS
+)
@@ -0,0 +1,273 @@
+"""
+Bulk Catalog Import
+Streams CSV / NDJSON product rows, validates them with the Product and
+Inventory models and writes them to Appwrite in concurrent batches
+"""
+import asyncio
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from appwrite.exception import AppwriteException
+from appwrite.id import ID
+from pydantic import ValidationError
+
+from config.appwrite import DATABASE_ID
+from models.inventory import Inventory, is_low_stock
+from models.product import Product
+from services.catalog_cache import catalog_cache
+from services.forecast_cache import forecast_cache
+from services.repository import db
+
+
+BATCH_SIZE = 100       # rows per create_rows call
+MAX_CONCURRENCY = 4    # batches in flight at once
+
+INVENTORY_FIELDS = {"stock_quantity", "min_stock_level", "last_restock_date"}
+WRITE_EXCLUDE = {"id", "created_at", "updated_at"}
+
+
+class CatalogFormatError(ValueError):
+    """The body can't be read as the given format at all (e.g. an unreadable CSV header)"""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without buffering the whole body"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if buffer:
+        yield buffer.rstrip(b"\r")
+
+
+def parse_json_line(line: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        return None, f"Invalid JSON: {e}"
+    if not isinstance(record, dict):
+        return None, "Expected a JSON object"
+    return record, None
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes],
+    fmt: str
+) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Yield (line_number, record, parse_error) for each non-blank record.
+    A CSV record spans lines while a quoted field is open (line_number is its
+    first line); lines are buffered only until the record's quotes balance.
+    Undecodable lines and malformed records are reported per record; raises
+    CatalogFormatError if the CSV header itself can't be read.
+    """
+    header: Optional[List[str]] = None
+    pending: List[str] = []   # lines of the current CSV record
+    quotes = 0                # '"' seen in it; odd while a quoted field is open
+    decode_error: Optional[str] = None
+    first_line = line_number = 0
+
+    def csv_values() -> Tuple[Optional[List[str]], Optional[str]]:
+        try:
+            return next(csv.reader(line + "\n" for line in pending)), None
+        except csv.Error as e:
+            return None, f"Invalid CSV: {e}"
+
+    async for raw in iter_lines(chunks):
+        line_number += 1
+        if not pending:
+            first_line = line_number
+        try:
+            line = raw.decode("utf-8-sig")
+        except UnicodeDecodeError as e:
+            error = f"Invalid UTF-8 on line {line_number} at byte {e.start}: {e.reason}"
+            if fmt == "ndjson":
+                yield line_number, None, error
+                continue
+            # Keep the line in its record so quotes stay balanced; the record is rejected
+            line = raw.decode("utf-8-sig", errors="replace")
+            decode_error = decode_error or error
+
+        if fmt == "ndjson":
+            if line.strip():
+                record, error = parse_json_line(line)
+                yield line_number, record, error
+            continue
+
+        if not pending and not line.strip():
+            continue
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+
+        values, error = csv_values()
+        error = decode_error or error
+        pending, quotes, decode_error = [], 0, None
+        if header is None:
+            if error:
+                raise CatalogFormatError(f"CSV header (line {first_line}): {error}")
+            header = [h.strip() for h in values]
+            continue
+        if error:
+            yield first_line, None, error
+        elif len(values) != len(header):
+            yield first_line, None, f"Expected {len(header)} columns, got {len(values)}"
+        else:
+            # Empty CSV cells mean "not provided" so model defaults apply
+            yield first_line, {k: v for k, v in zip(header, values) if v != ""}, None
+
+    if pending:
+        if header is None:
+            raise CatalogFormatError(f"CSV header (line {first_line}): unterminated quoted field")
+        yield first_line, None, "Unterminated quoted field"
+
+
+def validate_record(
+    record: Dict[str, Any],
+    default_shop_id: Optional[str]
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Build product (and optional inventory) row data for one record.
+    Inventory is created when the record carries stock_quantity;
+    min_stock_level defaults to 0. Raises ValidationError on bad input.
+    """
+    record = dict(record)
+    if default_shop_id and not record.get("shop_id"):
+        record["shop_id"] = default_shop_id
+
+    product_id = ID.unique()
+    product = Product(**{k: v for k, v in record.items() if k not in INVENTORY_FIELDS})
+    product_row = {"$id": product_id, **product.model_dump(mode="json", exclude=WRITE_EXCLUDE)}
+
+    inventory_row = None
+    if "stock_quantity" in record:
+        inventory = Inventory(
+            shop_id=product.shop_id,
+            product_id=product_id,
+            stock_quantity=record["stock_quantity"],
+            min_stock_level=record.get("min_stock_level", 0),
+            last_restock_date=record.get("last_restock_date")
+        )
+        inventory.is_low_stock = is_low_stock(inventory.stock_quantity, inventory.min_stock_level)
+        inventory_row = {"$id": ID.unique(), **inventory.model_dump(mode="json", exclude=WRITE_EXCLUDE)}
+
+    return product_row, inventory_row
+
+
+async def write_rows(table_id: str, rows: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """
+    Write one batch; returns {row_id: error_or_None}.
+    If the bulk call is rejected, rows are retried one by one to pinpoint failures.
+    """
+    try:
+        await db.create_rows(DATABASE_ID, table_id, rows)
+        return {row["$id"]: None for row in rows}
+    except AppwriteException:
+        pass
+
+    async def write_one(row: Dict[str, Any]) -> Optional[str]:
+        data = {k: v for k, v in row.items() if k != "$id"}
+        try:
+            await db.create_row(DATABASE_ID, table_id, row["$id"], data)
+            return None
+        except AppwriteException as e:
+            return str(e)
+
+    errors = await asyncio.gather(*(write_one(row) for row in rows))
+    return {row["$id"]: error for row, error in zip(rows, errors)}
+
+
+async def import_batch(batch: List[Tuple[int, Dict, Optional[Dict]]]) -> List[Dict[str, Any]]:
+    """Write products first, then inventory rows for the products that succeeded"""
+    product_errors = await write_rows("products", [product for _, product, _ in batch])
+
+    inventory_rows = [
+        inventory for _, product, inventory in batch
+        if inventory and product_errors[product["$id"]] is None
+    ]
+    inventory_errors = await write_rows("inventory", inventory_rows) if inventory_rows else {}
+
+    report = []
+    for line_number, product, inventory in batch:
+        error = product_errors[product["$id"]]
+        entry = {"line": line_number, "name": product["name"]}
+        if error:
+            entry.update(status="error", error=error)
+        else:
+            entry.update(status="created", product_id=product["$id"])
+            if inventory:
+                inventory_error = inventory_errors.get(inventory["$id"])
+                if inventory_error:
+                    entry.update(status="partial", error=f"Inventory: {inventory_error}")
+                else:
+                    entry["inventory_id"] = inventory["$id"]
+        report.append(entry)
+    return report
+
+
+async def import_catalog(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    default_shop_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Import a product catalog from a streamed CSV or NDJSON body.
+    Rows are validated as they arrive; full batches are written while
+    parsing continues, with at most MAX_CONCURRENCY batches in flight.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    tasks: List[asyncio.Task] = []
+    results: List[Dict[str, Any]] = []
+    shop_ids = set()
+    batch: List[Tuple[int, Dict, Optional[Dict]]] = []
+
+    async def run(rows):
+        try:
+            return await import_batch(rows)
+        finally:
+            semaphore.release()
+
+    async def flush():
+        nonlocal batch
+        # Take the slot here and hand it to the task, so parsing stops while
+        # MAX_CONCURRENCY batches are in flight and memory stays bounded
+        await semaphore.acquire()
+        tasks.append(asyncio.create_task(run(batch)))
+        batch = []
+
+    async for line_number, record, parse_error in iter_records(chunks, fmt):
+        if parse_error:
+            results.append({"line": line_number, "status": "invalid", "error": parse_error})
+            continue
+        try:
+            product_row, inventory_row = validate_record(record, default_shop_id)
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results.append({"line": line_number, "status": "invalid", "error": errors})
+            continue
+
+        shop_ids.add(product_row["shop_id"])
+        batch.append((line_number, product_row, inventory_row))
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+
+    for report in await asyncio.gather(*tasks):
+        results.extend(report)
+
+    for shop_id in shop_ids:
+        catalog_cache.invalidate(shop_id)
+        forecast_cache.invalidate(shop_id)
+
+    results.sort(key=lambda r: r["line"])
+    summary = {status: 0 for status in ("created", "partial", "invalid", "error")}
+    for r in results:
+        summary[r["status"]] += 1
+
+    return {"total_rows": len(results), "summary": summary, "results": results}
@@ -0,0 +1,251 @@
+"""
+Daily Sales Rollup
+Per shop / product / day sales totals maintained incrementally from order writes
+"""
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from appwrite.exception import AppwriteException
+from appwrite.query import Query
+
+from config.appwrite import DATABASE_ID
+from services.forecast_cache import forecast_cache
+from services.repository import db
+
+
+TABLE_ID = "daily_sales"
+
+# Shop-wide row per day: quantity/revenue across all products, order_count = orders placed
+ALL_PRODUCTS = "*"
+
+COUNTERS = ("quantity", "revenue", "order_count")
+
+Key = Tuple[str, str, str]  # (shop_id, product_key, date)
+
+
+def row_id(shop_id: str, product_key: str, date: str) -> str:
+    """Deterministic row ID so concurrent writers converge on the same row"""
+    digest = hashlib.sha1(f"{shop_id}|{product_key}|{date}".encode()).hexdigest()[:32]
+    return f"ds{digest}"
+
+
+def parse_items(items: Any) -> List[Dict[str, Any]]:
+    """orders.items is stored as a JSON string; accept either form"""
+    if isinstance(items, str):
+        try:
+            items = json.loads(items)
+        except json.JSONDecodeError:
+            return []
+    return [item for item in (items or []) if isinstance(item, dict)]
+
+
+def product_key(item: Dict[str, Any]) -> str:
+    """product_id, or the name for lines that were never matched to a product"""
+    return item.get("product_id") or f"name:{(item.get('product_name') or 'Unknown').lower()}"
+
+
+def contribution(order: Optional[Dict[str, Any]]) -> Dict[Key, Dict[str, Any]]:
+    """
+    What one order adds to the rollup. Cancelled (or missing) orders add nothing,
+    so any write is handled as contribution(after) - contribution(before).
+    """
+    if not order or order.get("status") == "cancelled":
+        return {}
+
+    shop_id = order["shop_id"]
+    date = order["$createdAt"][:10]
+    totals: Dict[Key, Dict[str, Any]] = {}
+
+    for item in parse_items(order.get("items")):
+        quantity = float(item.get("quantity") or 0)
+        revenue = float(item.get("total") or float(item.get("price") or 0) * quantity)
+        key = (shop_id, product_key(item), date)
+        entry = totals.setdefault(key, {
+            "product_name": item.get("product_name") or "Unknown",
+            "quantity": 0.0, "revenue": 0.0, "order_count": 1
+        })
+        entry["quantity"] += quantity
+        entry["revenue"] += revenue
+
+    if totals:
+        totals[(shop_id, ALL_PRODUCTS, date)] = {
+            "product_name": "All products",
+            "quantity": sum(t["quantity"] for t in totals.values()),
+            "revenue": sum(t["revenue"] for t in totals.values()),
+            "order_count": 1
+        }
+    return totals
+
+
+def diff(before: Optional[Dict], after: Optional[Dict]) -> Dict[Key, Dict[str, Any]]:
+    old, new = contribution(before), contribution(after)
+    deltas = {}
+    for key in old.keys() | new.keys():
+        delta = {c: new.get(key, {}).get(c, 0) - old.get(key, {}).get(c, 0) for c in COUNTERS}
+        if any(abs(v) > 1e-9 for v in delta.values()):
+            delta["product_name"] = (new.get(key) or old.get(key))["product_name"]
+            deltas[key] = delta
+    return deltas
+
+
+async def _apply(key: Key, delta: Dict[str, Any]):
+    """
+    Server-side increment / decrement per column (each one is race-free, but the
+    columns are separate calls, so a failure part-way leaves the row partly updated
+    until rebuild_daily_sales). Decrements never go below zero. The row is created
+    on first sale.
+    """
+    shop_id, product, date = key
+    rid = row_id(shop_id, product, date)
+
+    async def increment_all():
+        for column in COUNTERS:
+            value = delta[column]
+            if value > 0:
+                await db.increment_row_column(DATABASE_ID, TABLE_ID, rid, column, value)
+            elif value < 0:
+                await db.decrement_row_column(DATABASE_ID, TABLE_ID, rid, column, -value, min=0)
+
+    try:
+        await increment_all()
+        return
+    except AppwriteException as e:
+        if e.code != 404:
+            raise
+
+    # A missing row holds nothing to take back (e.g. cancelling an order whose
+    # create-time write failed), so only the positive part of the delta is written
+    values = {column: max(0, delta[column]) for column in COUNTERS}
+    if not any(values.values()):
+        return
+    try:
+        await db.create_row(DATABASE_ID, TABLE_ID, rid, {
+            "shop_id": shop_id,
+            "product_id": product,
+            "product_name": delta["product_name"],
+            "date": date,
+            **values
+        })
+    except AppwriteException as e:
+        if e.code != 409:
+            raise
+        # Another writer created the row first
+        await increment_all()
+
+
+def _sales_changed(shop_id: str):
+    """Drop derived per-shop state: cached forecasts and sales cubes"""
+    from services.sales_cube import sales_cube_cache  # sales_cube builds on this module
+
+    forecast_cache.invalidate(shop_id)
+    sales_cube_cache.invalidate(shop_id)
+
+
+async def apply_order_change(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]):
+    """
+    Fold one order write into the rollup: create (None -> order), status change
+    or item edit (order -> order), delete (order -> None). Only transitions into or
+    out of `cancelled`, and item edits, change any totals. Failures are logged;
+    rebuild_daily_sales.py recomputes the table from orders.
+    Cached forecasts and sales cubes for the shop are dropped whenever its sales change.
+    """
+    deltas = diff(before, after)
+    if not deltas:
+        return
+    _sales_changed((after or before)["shop_id"])
+    try:
+        await asyncio.gather(*(_apply(key, delta) for key, delta in deltas.items()))
+    except AppwriteException as e:
+        order_id = (after or before).get("$id")
+        print(f"⚠️  daily_sales update failed for order {order_id}: {e}")
+
+
+async def get_daily_sales(
+    shop_id: str,
+    days: int = 30,
+    product_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Rollup rows for the last `days` days: one per product per day with sales,
+    plus the shop-wide '*' rows (omitted when filtering to one product).
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
+    queries = [
+        Query.equal("shop_id", shop_id),
+        Query.greater_than_equal("date", cutoff)
+    ]
+    if product_id:
+        queries.append(Query.equal("product_id", product_id))
+    return [row async for row in db.iter_rows(DATABASE_ID, TABLE_ID, queries)]
+
+
+async def last_sales_change(shop_id: str, days: int = 30) -> Optional[float]:
+    """
+    Epoch seconds of the newest rollup write for the shop's last `days` days, seen
+    by every process: each order write touches that day's '*' row.
+    None if the shop has no sales in the window.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
+    result = await db.list_rows(DATABASE_ID, TABLE_ID, [
+        Query.equal("shop_id", shop_id),
+        Query.equal("product_id", ALL_PRODUCTS),
+        Query.greater_than_equal("date", cutoff),
+        Query.order_desc("$updatedAt"),
+        Query.limit(1)
+    ])
+    rows = result.get("rows", [])
+    if not rows or not rows[0].get("$updatedAt"):
+        return None
+    return datetime.fromisoformat(rows[0]["$updatedAt"]).timestamp()
+
+
+def accumulate(totals: Dict[Key, Dict[str, Any]], order: Dict[str, Any]):
+    """Add one order to an in-memory rollup (see rebuild_daily_sales)"""
+    for key, values in contribution(order).items():
+        entry = totals.setdefault(key, {c: 0 for c in COUNTERS})
+        entry["product_name"] = values["product_name"]
+        for column in COUNTERS:
+            entry[column] += values[column]
+
+
+async def rebuild_daily_sales(shop_id: Optional[str] = None, concurrency: int = 8) -> Dict[str, int]:
+    """
+    Recompute the rollup from orders (one shop or all) and overwrite it.
+    Rows are upserted with absolute values and rows with no remaining sales are
+    deleted. Orders written while this runs can be double-counted or missed, so
+    run it when order traffic is quiet.
+    """
+    scope = [Query.equal("shop_id", shop_id)] if shop_id else []
+
+    totals: Dict[Key, Dict[str, Any]] = {}
+    orders = 0
+    async for order in db.iter_rows(DATABASE_ID, "orders", scope):
+        accumulate(totals, order)
+        orders += 1
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def upsert(key: Key, values: Dict[str, Any]):
+        shop, product, date = key
+        async with semaphore:
+            await db.upsert_row(DATABASE_ID, TABLE_ID, row_id(shop, product, date), {
+                "shop_id": shop, "product_id": product, "date": date, **values
+            })
+
+    async def delete(rid: str):
+        async with semaphore:
+            await db.delete_row(DATABASE_ID, TABLE_ID, rid)
+
+    await asyncio.gather(*(upsert(key, values) for key, values in totals.items()))
+
+    wanted = {row_id(*key) for key in totals}
+    stale = [row["$id"] async for row in db.iter_rows(DATABASE_ID, TABLE_ID, scope) if row["$id"] not in wanted]
+    await asyncio.gather(*(delete(rid) for rid in stale))
+
+    for shop in {key[0] for key in totals} | ({shop_id} if shop_id else set()):
+        _sales_changed(shop)
+
+    return {"orders": orders, "rows": len(totals), "deleted": len(stale)}
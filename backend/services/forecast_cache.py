@@ -0,0 +1,98 @@
+"""
+Forecast Result Cache
+In-process, per-shop cache of demand forecasts shared by the forecasting endpoints
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config.settings import settings
+from services.single_flight import single_flight
+
+
+class ForecastCache:
+    """
+    TTL + LRU cache of forecast results keyed by shop_id (AI insights are cached
+    separately, see forecast_insights.py). Each entry also indexes its product_ids
+    so product writes can find the shop to invalidate.
+    Results are shared between callers - do not mutate them.
+    Order and product writes call invalidate() so the next read recomputes.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any], Dict[str, Dict]]]" = OrderedDict()
+        # Bumped on invalidation so a computation that raced with a write is not stored
+        self._versions: Dict[str, int] = {}
+        # Wall-clock time of each shop's last invalidation, so older persisted forecasts are skipped
+        self._invalidated_at: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _fresh(self, shop_id: str):
+        entry = self._entries.get(shop_id)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(shop_id)
+            return entry
+        return None
+
+    async def get(self, shop_id: str, build: Callable[[str], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Return the cached forecast, computing it with build(shop_id) on miss or expiry"""
+        entry = self._fresh(shop_id)
+        if entry:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        version = self._versions.get(shop_id, 0)
+        # Concurrent misses for the same shop share one computation
+        result = await single_flight.do(("forecast", shop_id), build, shop_id)
+
+        if self._versions.get(shop_id, 0) == version:
+            by_id = {p["product_id"]: p for p in result.get("predictions", []) if p.get("product_id")}
+            self._entries[shop_id] = (time.monotonic() + self.ttl_seconds, result, by_id)
+            self._entries.move_to_end(shop_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return result
+
+    def invalidate(self, shop_id: str):
+        """Drop one shop's forecasts (call after order or product writes for that shop)"""
+        self._versions[shop_id] = self._versions.get(shop_id, 0) + 1
+        self._invalidated_at[shop_id] = time.time()
+        self._entries.pop(shop_id, None)
+        self.invalidations += 1
+
+    def last_invalidated(self, shop_id: str) -> Optional[float]:
+        """Epoch seconds of the shop's last invalidation in this process, if any"""
+        return self._invalidated_at.get(shop_id)
+
+    def invalidate_product(self, product_id: str) -> Optional[str]:
+        """Drop the forecasts of whichever shop has `product_id`; returns its shop_id"""
+        for shop_id, entry in list(self._entries.items()):
+            if product_id in entry[2]:
+                self.invalidate(shop_id)
+                return shop_id
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+forecast_cache = ForecastCache(
+    ttl_seconds=settings.FORECAST_CACHE_TTL,
+    max_entries=settings.FORECAST_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,309 @@
+"""
+Statistical Forecast Engine
+Exponential smoothing with day-of-week seasonality, fitted for every product at once on a product x day matrix
+"""
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.sales_cube import SalesCube
+
+
+# Smoothing constants tried per product; the one with the lowest one-step error wins
+ALPHA_GRID = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+# Seasonal smoothing (kept low: 30 days is only ~4 observations per weekday)
+GAMMA = 0.1
+
+# Daily rate assumed for products with no sales in the window (new or untracked items)
+PRIOR_DAILY_RATE = 0.5
+
+# Simulation mode: stockout probabilities are reported at these horizons (days), and the
+# service-level reorder quantity covers demand over the longest one
+STOCKOUT_HORIZONS = (3, 7, 14)
+# Fixed seed so the same history always gives the same forecast
+SIMULATION_SEED = 0
+# Paths x products cells simulated per block (float32 buffers of ~256 KB)
+SIMULATION_BLOCK_CELLS = 65536
+
+
+def _initial_state(matrix: np.ndarray, weekdays: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Initial state from the whole window: mean level, weekday deviations from it"""
+    level0 = matrix.mean(axis=1)
+    season0 = np.zeros((matrix.shape[0], 7))
+    for weekday in range(7):
+        mask = weekdays == weekday
+        if mask.any():
+            season0[:, weekday] = matrix[:, mask].mean(axis=1) - level0
+    return level0, season0
+
+
+def fit_seasonal_smoothing(matrix: np.ndarray, weekdays: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Additive exponential smoothing with a weekly season (ETS(A,N,A)) for all rows.
+
+    Every alpha in ALPHA_GRID is run side by side as an extra array axis, so the only
+    Python loop is over days. Returns per-product level, season [products x 7]
+    (indexed by weekday), alpha and residual standard deviation.
+    """
+    n_products, n_days = matrix.shape
+    n_alphas = len(ALPHA_GRID)
+    alpha = ALPHA_GRID[:, None]
+
+    level0, season0 = _initial_state(matrix, weekdays)
+    level = np.broadcast_to(level0, (n_alphas, n_products)).copy()
+    season = np.broadcast_to(season0, (n_alphas, n_products, 7)).copy()
+    sse = np.zeros((n_alphas, n_products))
+
+    for t in range(n_days):
+        weekday = weekdays[t]
+        error = matrix[:, t] - (level + season[:, :, weekday])
+        sse += error ** 2
+        level += alpha * error
+        season[:, :, weekday] += GAMMA * (1 - alpha) * error
+
+    best = sse.argmin(axis=0)
+    columns = np.arange(n_products)
+    return {
+        "level": level[best, columns],
+        "season": season[best, columns],
+        "alpha": ALPHA_GRID[best],
+        "sigma": np.sqrt(sse[best, columns] / max(n_days, 1)),
+    }
+
+
+def smoothing_path(matrix: np.ndarray, weekdays: np.ndarray, alpha: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Replay the smoothing over the history with each product's fitted alpha:
+    one-step-ahead fitted values and the level (deseasonalised trend) after each
+    day, both [products x days]. For the few products a detail page shows, not
+    the whole catalog.
+    """
+    level, season = _initial_state(matrix, weekdays)
+    fitted = np.zeros_like(matrix, dtype=float)
+    levels = np.zeros_like(matrix, dtype=float)
+    for t in range(matrix.shape[1]):
+        weekday = weekdays[t]
+        fitted[:, t] = level + season[:, weekday]
+        error = matrix[:, t] - fitted[:, t]
+        level = level + alpha * error
+        season[:, weekday] += GAMMA * (1 - alpha) * error
+        levels[:, t] = level
+    return {"fitted": np.clip(fitted, 0, None), "level": levels}
+
+
+def daily_forecast(fit: Dict[str, np.ndarray], first_weekday: int, horizon: int) -> np.ndarray:
+    """Expected demand per product per day over the next `horizon` days [products x horizon]"""
+    future_weekdays = (first_weekday + np.arange(horizon)) % 7
+    return np.clip(fit["level"][:, None] + fit["season"][:, future_weekdays], 0, None)
+
+
+def forecast_totals(
+    fit: Dict[str, np.ndarray],
+    first_weekday: int,
+    horizon: int,
+    interval: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (expected total, lower, upper) demand over the next `horizon` days.
+    The interval treats daily errors as independent normal shocks that also feed the
+    level: Var(sum) = sigma^2 * sum_k (1 + alpha*k)^2 for k in 0..horizon-1.
+    """
+    total = daily_forecast(fit, first_weekday, horizon).sum(axis=1)
+
+    # Count-data floor: sparse sellers rarely have less spread than Poisson
+    sigma = np.maximum(fit["sigma"], np.sqrt(total / horizon))
+    k = np.arange(horizon)
+    spread = sigma * np.sqrt(((1 + fit["alpha"][:, None] * k) ** 2).sum(axis=1))
+    z = NormalDist().inv_cdf(0.5 + interval / 2)
+    return total, np.clip(total - z * spread, 0, None), total + z * spread
+
+
+def simulate_stockouts(
+    fit: Dict[str, np.ndarray],
+    first_weekday: int,
+    current_stock: np.ndarray,
+    paths: int,
+    service_level: float
+) -> Tuple[Dict[int, np.ndarray], np.ndarray]:
+    """
+    Monte Carlo demand paths for every product at once, from the same model as
+    forecast_totals: each day's demand is lognormal with mean level + season and the
+    fitted variance (non-negative, without the upward bias of clipping a normal at
+    zero), and its error feeds the level. Paths start from a perturbed level, since
+    the fitted one is itself an estimate. Only running totals are kept, so memory
+    does not grow with the horizon.
+    The standard-normal shocks are shared by all products (common random numbers):
+    each product's probabilities are unbiased, and drawing [horizon x paths] numbers
+    instead of [horizon x paths x products] keeps thousands of SKUs well under a second.
+    Returns ({horizon: P(cumulative demand > stock)}, service-level quantile of
+    demand over the longest horizon).
+    """
+    rng = np.random.default_rng(SIMULATION_SEED)
+    horizon = max(STOCKOUT_HORIZONS)
+    n_products = len(current_stock)
+    shocks = rng.standard_normal((horizon, paths, 1), dtype=np.float32)
+    start_shocks = rng.standard_normal((paths, 1), dtype=np.float32)
+
+    # Same count-data floor as forecast_totals
+    mean_daily = np.clip(fit["level"][:, None] + fit["season"], 0, None).mean(axis=1)
+    variance = np.maximum(fit["sigma"] ** 2, mean_daily).astype(np.float32)
+    # An EWMA of noisy days has variance sigma^2 * alpha / (2 - alpha)
+    level_sd = np.sqrt(variance * fit["alpha"] / (2 - fit["alpha"])).astype(np.float32)
+    season = fit["season"].astype(np.float32)
+    alpha = fit["alpha"].astype(np.float32)
+    stock = current_stock.astype(np.float32)
+
+    stockout = {days: np.empty(n_products) for days in STOCKOUT_HORIZONS}
+    cover = np.empty(n_products)
+    k = min(paths - 1, int(np.ceil(service_level * paths)) - 1)
+
+    # Products are simulated in blocks whose [paths x block] buffers stay in CPU cache;
+    # every step updates them in place
+    block = max(1, SIMULATION_BLOCK_CELLS // paths)
+    for lo in range(0, n_products, block):
+        hi = min(lo + block, n_products)
+        level = fit["level"][lo:hi].astype(np.float32) + level_sd[lo:hi] * start_shocks
+        np.maximum(level, 0, out=level)
+        total = np.zeros_like(level)
+        expected = np.empty_like(level)
+        demand = np.empty_like(level)
+        spread = np.empty_like(level)
+        for day in range(1, horizon + 1):
+            np.add(level, season[lo:hi, (first_weekday + day - 1) % 7], out=expected)
+            np.maximum(expected, 1e-6, out=expected)
+            # Lognormal: log-sd s = sqrt(log(1 + var / mean^2)), demand = mean * exp(s*z - s^2/2)
+            np.divide(variance[lo:hi], expected, out=spread)
+            spread /= expected
+            np.log1p(spread, out=spread)
+            np.multiply(spread, -0.5, out=demand)
+            np.sqrt(spread, out=spread)
+            spread *= shocks[day - 1]
+            demand += spread
+            np.exp(demand, out=demand)
+            demand *= expected
+            total += demand
+            demand -= expected
+            demand *= alpha[lo:hi]
+            level += demand
+            if day in STOCKOUT_HORIZONS:
+                stockout[day][lo:hi] = (total > stock[lo:hi]).mean(axis=0)
+        # Order statistic instead of np.quantile: one partial sort, no interpolation
+        cover[lo:hi] = np.partition(total, k, axis=0)[k]
+    return stockout, cover
+
+
+def calculate_statistical_forecast(
+    cube: SalesCube,
+    products: List[Dict],
+    inventory: Dict[str, Dict],
+    forecast_days: int = 7,
+    interval: float = 0.8,
+    simulation_paths: int = 0,
+    service_level: float = 0.95,
+    fit: Optional[Dict[str, np.ndarray]] = None
+) -> List[Dict]:
+    """
+    Per-product demand forecast from the shop's sales cube, in the same shape as the
+    rule-based forecast plus a `prediction_interval_7d`. History is the cube window
+    (complete UTC days); the forecast starts the day after it.
+    Products with no sales in the window fall back to PRIOR_DAILY_RATE.
+
+    Stock comes from `inventory` (inventory rows by product_id). Products without
+    an inventory row are forecast but not tracked: `current_stock`,
+    `days_until_stockout` and `stockout_probability` are None, no reorder is
+    recommended and they sort last.
+
+    With simulation_paths > 0 each prediction also gets `stockout_probability` at
+    STOCKOUT_HORIZONS from simulate_stockouts(), and reordering is driven by it: a
+    reorder is recommended when the 7-day stockout risk exceeds 1 - service_level,
+    for enough units to cover the service-level quantile of 14-day demand.
+
+    `fit` is the fit_seasonal_smoothing() result for cube.aligned(products) when the
+    caller already has one (get_product_trend); it is not modified.
+    """
+    if not products:
+        return []
+
+    weekdays = (cube.start.weekday() + np.arange(cube.days)) % 7
+    matrix, order_counts = cube.aligned(products)
+    if fit is None:
+        fit = fit_seasonal_smoothing(matrix, weekdays)
+    predicted, lower, upper = forecast_totals(fit, cube.end.weekday(), forecast_days, interval)
+
+    no_history = matrix.sum(axis=1) <= 0
+    fit = {
+        **fit,
+        "level": np.where(no_history, PRIOR_DAILY_RATE, fit["level"]),
+        "season": np.where(no_history[:, None], 0, fit["season"])
+    }
+    prior_total = PRIOR_DAILY_RATE * forecast_days
+    prior_spread = NormalDist().inv_cdf(0.5 + interval / 2) * np.sqrt(prior_total)
+    predicted = np.where(no_history, prior_total, predicted)
+    lower = np.where(no_history, max(0.0, prior_total - prior_spread), lower)
+    upper = np.where(no_history, prior_total + prior_spread, upper)
+
+    levels = [inventory.get(p.get("$id") or p.get("id")) for p in products]
+    tracked = np.array([level is not None for level in levels])
+    current_stock = np.array([level["stock_quantity"] if level else 0 for level in levels], dtype=float)
+    min_stock = np.array([level.get("min_stock_level") or 0 if level else 0 for level in levels], dtype=float)
+
+    avg_daily = predicted / forecast_days
+    stock_after = current_stock - predicted
+    reorder_recommended = stock_after < min_stock
+    reorder_quantity = np.maximum(0, avg_daily * 14 - stock_after + min_stock)
+    confidence = np.minimum(0.9, 0.5 + order_counts * 0.05)
+    with np.errstate(divide="ignore"):
+        days_until_stockout = np.where(avg_daily > 0, current_stock / avg_daily, 999)
+
+    stockout = {}
+    if simulation_paths > 0:
+        stockout, cover = simulate_stockouts(fit, cube.end.weekday(), current_stock, simulation_paths, service_level)
+        reorder_recommended = stockout[7] > 1 - service_level
+        reorder_quantity = np.where(reorder_recommended, np.ceil(np.maximum(0, cover - current_stock)), 0)
+    reorder_recommended &= tracked
+    reorder_quantity = np.where(tracked, reorder_quantity, 0)
+    days_until_stockout = np.where(tracked, days_until_stockout, np.inf)
+
+    # Round in bulk, then convert to Python scalars once per column
+    columns = {
+        "avg_daily_sales": np.round(avg_daily, 2).tolist(),
+        "predicted_demand_7d": np.round(predicted, 1).tolist(),
+        "lower": np.round(lower, 1).tolist(),
+        "upper": np.round(upper, 1).tolist(),
+        "confidence": np.round(confidence, 2).tolist(),
+        "reorder_recommended": reorder_recommended.tolist(),
+        "reorder_quantity": np.round(reorder_quantity, 0).tolist(),
+        "days_until_stockout": np.round(days_until_stockout, 1).tolist(),
+    }
+    stockout = {f"{days}d": np.round(p, 3).tolist() for days, p in stockout.items()}
+    tracked = tracked.tolist()
+
+    forecasts = []
+    # Most urgent first, untracked last; stable so ties keep catalog order
+    for i in np.argsort(days_until_stockout, kind="stable").tolist():
+        product = products[i]
+        forecasts.append({
+            "product_id": product.get("$id") or product.get("id"),
+            "product_name": product.get("name", ""),
+            "inventory_tracked": tracked[i],
+            "current_stock": levels[i]["stock_quantity"] if tracked[i] else None,
+            "avg_daily_sales": columns["avg_daily_sales"][i],
+            "predicted_demand_7d": columns["predicted_demand_7d"][i],
+            "prediction_interval_7d": {
+                "lower": columns["lower"][i],
+                "upper": columns["upper"][i],
+                "level": interval
+            },
+            "confidence": columns["confidence"][i],
+            "reorder_recommended": columns["reorder_recommended"][i],
+            "reorder_quantity": columns["reorder_quantity"][i],
+            "days_until_stockout": columns["days_until_stockout"][i] if tracked[i] else None,
+            "insight": "High demand" if columns["avg_daily_sales"][i] > 2 else "Normal demand"
+        })
+        if stockout:
+            forecasts[-1]["stockout_probability"] = (
+                {days: p[i] for days, p in stockout.items()} if tracked[i] else None
+            )
+            forecasts[-1]["service_level"] = service_level
+    return forecasts
@@ -0,0 +1,108 @@
+"""
+Forecast AI Insights
+Background LLM enrichment for forecasts, cached per shop so forecasts never wait on the model
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config.settings import settings
+
+
+Enrich = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+class ForecastInsights:
+    """
+    Per-shop AI insights computed in the background.
+
+    ensure() never blocks: it returns the current state and, when the shop has no
+    fresh insights, starts one background task for it (concurrent callers share it).
+    Finished insights are cached for `ttl_seconds`; failures for `retry_seconds`
+    so a failing model is not called on every request. Expired insights keep being
+    served while the refresh runs.
+    """
+
+    def __init__(self, ttl_seconds: float, retry_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+
+    def state(self, shop_id: str) -> Dict[str, Any]:
+        """Public view: status is ready, failed, pending (running, nothing cached yet) or none"""
+        entry = self._entries.get(shop_id)
+        if entry:
+            return {key: entry[key] for key in ("status", "insights", "risk_items", "generated_at")}
+        status = "pending" if shop_id in self._tasks else "none"
+        return {"status": status, "insights": [], "risk_items": [], "generated_at": None}
+
+    def ensure(self, shop_id: str, enrich: Enrich) -> Dict[str, Any]:
+        """Current state, starting a background refresh if the cached insights are missing or expired"""
+        entry = self._entries.get(shop_id)
+        fresh = entry and entry["expires_at"] > time.monotonic()
+        if not fresh and shop_id not in self._tasks:
+            task = asyncio.get_running_loop().create_task(self._run(shop_id, enrich))
+            self._tasks[shop_id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(shop_id, None))
+            self.started += 1
+        return self.state(shop_id)
+
+    async def wait(self, shop_id: str, enrich: Enrich, timeout: float) -> Dict[str, Any]:
+        """Like ensure(), but waits up to `timeout` seconds for a running task to finish"""
+        state = self.ensure(shop_id, enrich)
+        task: Optional[asyncio.Task] = self._tasks.get(shop_id)
+        if task is None:
+            return state
+        try:
+            # shield: a client disconnecting must not cancel the shared task
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.state(shop_id)
+
+    async def _run(self, shop_id: str, enrich: Enrich):
+        try:
+            result = await enrich(shop_id)
+            failed = bool(result.get("error"))
+        except Exception as e:
+            print(f"⚠️  AI insights failed for {shop_id}: {e}")
+            result = {"overall_insights": ["AI analysis unavailable"], "risk_items": []}
+            failed = True
+
+        previous = self._entries.get(shop_id)
+        if failed:
+            self.failed += 1
+            if previous and previous["status"] == "ready":
+                # Keep serving the last good insights; try again after retry_seconds
+                previous["expires_at"] = time.monotonic() + self.retry_seconds
+                return
+        else:
+            self.completed += 1
+
+        self._entries[shop_id] = {
+            "status": "failed" if failed else "ready",
+            "insights": result.get("overall_insights", []),
+            "risk_items": result.get("risk_items", []),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "expires_at": time.monotonic() + (self.retry_seconds if failed else self.ttl_seconds)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "shops_cached": len(self._entries),
+            "running": len(self._tasks),
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+forecast_insights = ForecastInsights(
+    ttl_seconds=settings.AI_INSIGHTS_TTL,
+    retry_seconds=settings.AI_INSIGHTS_RETRY
+)
@@ -0,0 +1,82 @@
+"""
+Precomputed Forecast Store
+Per-shop forecasts persisted in ai_insights so requests can serve them without recomputing
+"""
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from appwrite.exception import AppwriteException
+
+from config.appwrite import COLLECTION_AI_INSIGHTS, DATABASE_ID
+from services.repository import db
+
+
+INSIGHT_TYPE = "demand_forecast"
+
+
+def row_id(shop_id: str) -> str:
+    """One forecast row per shop, overwritten by each precompute run"""
+    return "fc" + hashlib.sha1(shop_id.encode()).hexdigest()[:32]
+
+
+def severity(forecast: Dict[str, Any]) -> str:
+    summary = forecast.get("summary", {})
+    if summary.get("items_critical"):
+        return "high"
+    if summary.get("items_need_reorder"):
+        return "medium"
+    return "low"
+
+
+async def save_forecast(forecast: Dict[str, Any], compute_ms: float, generated_at: Optional[datetime] = None):
+    """
+    Persist a shop's forecast. `generated_at` should be when its inputs were read
+    (default now), so sales written during the computation mark it stale.
+    """
+    summary = forecast.get("summary", {})
+    await db.upsert_row(DATABASE_ID, COLLECTION_AI_INSIGHTS, row_id(forecast["shop_id"]), {
+        "shop_id": forecast["shop_id"],
+        "type": INSIGHT_TYPE,
+        "message": (
+            f"{summary.get('items_need_reorder', 0)} items need reorder, "
+            f"{summary.get('items_critical', 0)} critical"
+        ),
+        "data": json.dumps(forecast),
+        "severity": severity(forecast),
+        "is_read": False,
+        "generated_at": (generated_at or datetime.now(timezone.utc)).isoformat(),
+        "compute_ms": round(compute_ms, 1)
+    })
+
+
+async def load_forecast(
+    shop_id: str,
+    max_age: float,
+    not_before: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    The shop's precomputed forecast, or None if there is none, it is older than
+    `max_age` seconds, or it was generated before `not_before` (epoch seconds,
+    e.g. the shop's last sales change). Read errors also return None so callers
+    fall back to computing live.
+    """
+    try:
+        row = await db.get_row(DATABASE_ID, COLLECTION_AI_INSIGHTS, row_id(shop_id))
+    except AppwriteException as e:
+        if e.code != 404:
+            print(f"⚠️  Precomputed forecast read failed for {shop_id}: {e}")
+        return None
+
+    if not row.get("generated_at") or not row.get("data"):
+        return None
+    generated = datetime.fromisoformat(row["generated_at"]).timestamp()
+    if time.time() - generated > max_age or (not_before and generated < not_before):
+        return None
+
+    forecast = json.loads(row["data"])
+    forecast["source"] = "precomputed"
+    forecast["precomputed_at"] = row["generated_at"]
+    return forecast
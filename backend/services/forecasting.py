@@ -2,13 +2,32 @@
 Demand Forecasting Service
 AI-powered demand prediction and inventory recommendations
 """
+import asyncio
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from collections import defaultdict
 
+import numpy as np
+
+from appwrite.query import Query
+
+from config.appwrite import DATABASE_ID
+from config.settings import settings
 from services.ai_service import AIService
-from config.appwrite import tables_db, DATABASE_ID
+from services.catalog_cache import catalog_cache
+from services.forecast_cache import forecast_cache
+from services.daily_sales import get_daily_sales, last_sales_change
+from services.forecast_engine import (
+    calculate_statistical_forecast, daily_forecast, fit_seasonal_smoothing, smoothing_path
+)
+from services.forecast_insights import forecast_insights
+from services.forecast_store import load_forecast
+from services.reorder_plan import plan_reorders
+from services.repository import db
+from services.sales_cube import SalesCube, sales_cube_cache, window_start
+
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
 
 
 FORECAST_PROMPT = """You are an AI inventory analyst for a local grocery store in India.
@@ -28,9 +47,9 @@ Provide predictions for the next 7 days. Consider:
 
 Respond with JSON:
 ```json
-{
+{{
   "predictions": [
-    {
+    {{
       "product_id": "id",
       "product_name": "name",
       "current_stock": 50,
@@ -39,159 +58,85 @@ Respond with JSON:
       "reorder_recommended": true,
       "reorder_quantity": 40,
       "insight": "High weekend demand expected"
-    }
+    }}
   ],
   "overall_insights": [
     "Rice and Oil show consistent daily demand",
     "Consider stocking extra sugar for upcoming festival"
   ],
   "risk_items": ["Product names that may run out"]
-}
+}}
 ```
 """
 
 
-async def get_order_history(shop_id: str, days: int = 30) -> List[Dict]:
-    """Fetch order history for analysis"""
+async def get_sales_cube(shop_id: str, days: int = 30, strict: bool = False) -> SalesCube:
+    """
+    A shop's sales cube for the last `days` days. If the rollup can't be read it is
+    empty, unless `strict` (then the error propagates - see precompute_shop).
+    """
     try:
-        # Get all orders
-        result = tables_db.list_rows(DATABASE_ID, "orders")
-        all_orders = result.get("rows", [])
-        
-        # Filter by shop and date
-        cutoff_date = datetime.now() - timedelta(days=days)
-        shop_orders = []
-        
-        for order in all_orders:
-            if order.get("shop_id") != shop_id:
-                continue
-            
-            # Parse order date
-            created_at = order.get("$createdAt") or order.get("created_at")
-            if created_at:
-                try:
-                    if isinstance(created_at, str):
-                        order_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    else:
-                        order_date = created_at
-                    
-                    if order_date.replace(tzinfo=None) >= cutoff_date:
-                        shop_orders.append(order)
-                except:
-                    shop_orders.append(order)  # Include if date parsing fails
-            else:
-                shop_orders.append(order)
-        
-        return shop_orders
+        return await sales_cube_cache.get(shop_id, days=days)
     except Exception as e:
+        if strict:
+            raise
         print(f"Error fetching order history: {e}")
-        return []
+        return SalesCube(shop_id, window_start(days), days, [])
 
 
-async def get_shop_products(shop_id: str) -> List[Dict]:
-    """Fetch current inventory"""
+async def get_shop_products(shop_id: str, strict: bool = False) -> List[Dict]:
+    """Fetch current inventory (empty on read errors unless `strict`)"""
     try:
-        result = tables_db.list_rows(DATABASE_ID, "products")
-        all_products = result.get("rows", [])
-        return [p for p in all_products if p.get("shop_id") == shop_id]
+        return await catalog_cache.get(shop_id)
     except Exception as e:
+        if strict:
+            raise
         print(f"Error fetching products: {e}")
         return []
 
 
-def aggregate_sales_data(orders: List[Dict]) -> Dict[str, Dict]:
-    """Aggregate sales by product"""
-    product_sales = defaultdict(lambda: {
-        "total_quantity": 0,
-        "total_revenue": 0,
-        "order_count": 0,
-        "daily_sales": defaultdict(float)
-    })
-    
-    for order in orders:
-        try:
-            items_str = order.get("items", "[]")
-            items = json.loads(items_str) if isinstance(items_str, str) else items_str
-            
-            order_date = order.get("$createdAt", "")[:10]  # Get date part
-            
-            for item in items:
-                product_name = item.get("product_name", "Unknown")
-                quantity = float(item.get("quantity", 0))
-                total = float(item.get("total", 0))
-                
-                product_sales[product_name]["total_quantity"] += quantity
-                product_sales[product_name]["total_revenue"] += total
-                product_sales[product_name]["order_count"] += 1
-                product_sales[product_name]["daily_sales"][order_date] += quantity
-        except Exception as e:
-            print(f"Error processing order: {e}")
-            continue
-    
-    return dict(product_sales)
+async def get_shop_inventory(shop_id: str, strict: bool = False) -> Dict[str, Dict]:
+    """The shop's inventory rows by product_id (empty on read errors unless `strict`)"""
+    try:
+        queries = [Query.equal("shop_id", shop_id)]
+        return {row["product_id"]: row async for row in db.iter_rows(DATABASE_ID, "inventory", queries)}
+    except Exception as e:
+        if strict:
+            raise
+        print(f"Error fetching inventory: {e}")
+        return {}
 
 
-def calculate_simple_forecast(
-    sales_data: Dict[str, Dict],
-    products: List[Dict],
-    forecast_days: int = 7
-) -> List[Dict]:
-    """Calculate simple rule-based forecast"""
-    forecasts = []
-    
-    for product in products:
-        product_name = product.get("name", "")
-        product_id = product.get("$id") or product.get("id")
-        current_stock = product.get("quantity", 0) or 50  # Default stock if not tracked
-        min_stock = product.get("low_stock_threshold", 10) or 10
-        
-        # Get sales data for this product
-        sales = sales_data.get(product_name, {})
-        total_quantity = sales.get("total_quantity", 0)
-        order_count = sales.get("order_count", 0)
-        
-        # Calculate average daily sales (assume 30 day history)
-        avg_daily_sales = total_quantity / 30 if total_quantity > 0 else 0.5
-        
-        # Predict demand for next 7 days
-        predicted_demand = avg_daily_sales * forecast_days
-        
-        # Add weekend boost (20% more)
-        predicted_demand *= 1.1
-        
-        # Calculate if reorder is needed
-        stock_after_forecast = current_stock - predicted_demand
-        reorder_recommended = stock_after_forecast < min_stock
-        
-        # Calculate reorder quantity (cover next 2 weeks + safety stock)
-        reorder_quantity = max(0, (avg_daily_sales * 14) - stock_after_forecast + min_stock)
-        
-        # Confidence based on data availability
-        confidence = min(0.9, 0.5 + (order_count * 0.05))
-        
-        forecasts.append({
-            "product_id": product_id,
-            "product_name": product_name,
-            "current_stock": current_stock,
-            "avg_daily_sales": round(avg_daily_sales, 2),
-            "predicted_demand_7d": round(predicted_demand, 1),
-            "confidence": round(confidence, 2),
-            "reorder_recommended": reorder_recommended,
-            "reorder_quantity": round(reorder_quantity, 0),
-            "days_until_stockout": round(current_stock / avg_daily_sales, 1) if avg_daily_sales > 0 else 999,
-            "insight": "High demand" if avg_daily_sales > 2 else "Normal demand"
-        })
-    
-    # Sort by urgency (days until stockout)
-    forecasts.sort(key=lambda x: x["days_until_stockout"])
-    
-    return forecasts
+async def last_inventory_change(shop_id: str) -> Optional[float]:
+    """Epoch seconds of the shop's newest inventory write (None if it has no inventory)"""
+    result = await db.list_rows(DATABASE_ID, "inventory", [
+        Query.equal("shop_id", shop_id),
+        Query.order_desc("$updatedAt"),
+        Query.limit(1)
+    ])
+    rows = result.get("rows", [])
+    if not rows or not rows[0].get("$updatedAt"):
+        return None
+    return datetime.fromisoformat(rows[0]["$updatedAt"]).timestamp()
+
+
+def aggregate_sales_data(cube: SalesCube) -> Dict[str, Dict]:
+    """Window totals per product name (the AI prompt's sales summary)"""
+    product_sales = {}
+    for totals in cube.product_totals().values():
+        entry = product_sales.setdefault(
+            totals["product_name"], {"total_quantity": 0.0, "total_revenue": 0.0, "order_count": 0}
+        )
+        for key in entry:
+            entry[key] += totals[key]
+    return product_sales
 
 
 async def generate_ai_forecast(
     shop_id: str,
     sales_data: Dict[str, Dict],
-    products: List[Dict]
+    products: List[Dict],
+    inventory: Dict[str, Dict]
 ) -> Dict[str, Any]:
     """Generate AI-powered forecast with insights"""
     ai = AIService()
@@ -208,11 +153,13 @@ async def generate_ai_forecast(
     
     inventory_summary = []
     for product in products:
+        product_id = product.get("$id") or product.get("id")
+        level = inventory.get(product_id)
         inventory_summary.append({
-            "id": product.get("$id") or product.get("id"),
+            "id": product_id,
             "name": product.get("name"),
             "price": product.get("price"),
-            "stock": product.get("quantity", 50)
+            "stock": level["stock_quantity"] if level else "not tracked"
         })
     
     prompt = FORECAST_PROMPT.format(
@@ -237,7 +184,8 @@ async def generate_ai_forecast(
             return {
                 "predictions": [],
                 "overall_insights": ["AI insights processing..."],
-                "risk_items": []
+                "risk_items": [],
+                "error": True
             }
         
     except json.JSONDecodeError as e:
@@ -245,14 +193,16 @@ async def generate_ai_forecast(
         return {
             "predictions": [],
             "overall_insights": ["AI analysis unavailable - JSON parse error"],
-            "risk_items": []
+            "risk_items": [],
+            "error": True
         }
     except Exception as e:
         print(f"AI forecast error: {e}")
         return {
             "predictions": [],
             "overall_insights": ["AI analysis unavailable"],
-            "risk_items": []
+            "risk_items": [],
+            "error": True
         }
 
 
@@ -260,46 +210,221 @@ async def get_demand_forecast(shop_id: str, use_ai: bool = True) -> Dict[str, An
     """
     Main forecasting function.
     Returns demand predictions and recommendations.
+    Predictions are cached per shop until the TTL or the next order or product
+    write (see forecast_cache.py); the returned dict is shared between callers
+    and must not be mutated.
+    With use_ai the model is never awaited: insights come from the per-shop AI
+    cache, and `insights_status` is "pending" while they are generated in the
+    background (poll /forecasting/insights/{shop_id} or stream it).
+    """
+    forecast = await forecast_cache.get(shop_id, _load_forecast)
+    if not use_ai:
+        return forecast
+
+    ai = forecast_insights.ensure(shop_id, enrich_forecast)
+    return {
+        **forecast,
+        "insights": ai["insights"],
+        "insights_status": ai["status"],
+        "insights_generated_at": ai["generated_at"]
+    }
+
+
+async def find_product(shop_id: str, product_name: str) -> Optional[Dict]:
+    """Catalog product by case-insensitive name, or None"""
+    name = product_name.lower()
+    return next((p for p in await get_shop_products(shop_id) if (p.get("name") or "").lower() == name), None)
+
+
+async def get_product_trend(shop_id: str, product_id: str, days: int = 30) -> Optional[Dict[str, Any]]:
+    """
+    One product's daily sales, fitted trend and forecast, computed from that
+    product's rollup rows only (shop_product_date_idx) instead of the shop's whole
+    forecast. None if the product is not in the shop.
+    Unlinked order lines (no product_id) are not counted here.
+    """
+    product, rows, levels = await asyncio.gather(
+        catalog_cache.get_product(shop_id, product_id),
+        get_daily_sales(shop_id, days=days, product_id=product_id),
+        db.list_rows(DATABASE_ID, "inventory", [
+            Query.equal("shop_id", shop_id),
+            Query.equal("product_id", product_id),
+            Query.limit(1)
+        ])
+    )
+    if not product:
+        return None
+
+    cube = SalesCube(shop_id, window_start(days), days, rows)
+    matrix, _ = cube.aligned([product])
+    weekdays = (cube.start.weekday() + np.arange(days)) % 7
+    # One fit serves both the prediction and the trend path below
+    fit = fit_seasonal_smoothing(matrix, weekdays)
+    prediction = calculate_statistical_forecast(
+        cube,
+        [product],
+        {row["product_id"]: row for row in levels.get("rows", [])},
+        forecast_days=7,
+        simulation_paths=settings.FORECAST_SIMULATION_PATHS,
+        service_level=settings.FORECAST_SERVICE_LEVEL,
+        fit=fit
+    )[0]
+
+    path = smoothing_path(matrix, weekdays, fit["alpha"])
+    ahead = daily_forecast(fit, cube.end.weekday(), 7)[0]
+
+    # Least-squares slope of the level; "flat" within 5% of the mean level per week
+    level = path["level"][0]
+    slope = float(np.polyfit(np.arange(days), level, 1)[0]) if days > 1 else 0.0
+    weekly_change = slope * 7 / max(float(level.mean()), 1e-9)
+    direction = "rising" if weekly_change > 0.05 else "falling" if weekly_change < -0.05 else "flat"
+
+    return {
+        "shop_id": shop_id,
+        "product_id": product_id,
+        "product_name": product.get("name", ""),
+        "days": days,
+        "daily_sales": [
+            {"date": day, "quantity": quantity, "fitted": round(fitted, 2), "trend": round(trend, 2)}
+            for day, quantity, fitted, trend in zip(
+                cube.dates(), matrix[0].tolist(), path["fitted"][0].tolist(), level.tolist()
+            )
+        ],
+        "trend": {
+            "direction": direction,
+            "slope_per_day": round(slope, 3) or 0.0,
+            "weekly_pattern": {WEEKDAYS[d]: round(float(fit["season"][0, d]), 2) for d in range(7)},
+            "alpha": float(fit["alpha"][0]),
+        },
+        "forecast": prediction,
+        "daily_forecast": [
+            {"date": (cube.end + timedelta(days=d)).isoformat(), "quantity": round(quantity, 2)}
+            for d, quantity in enumerate(ahead.tolist())
+        ],
+    }
+
+
+async def get_reorder_plan(shop_id: str, budget: float, horizon_days: int = 14) -> Dict[str, Any]:
+    """Reorder quantities that fit `budget`, from the shop's cached forecast (see reorder_plan.py)"""
+    forecast = await get_demand_forecast(shop_id, use_ai=False)
+    products = await get_shop_products(shop_id, strict=True)
+    plan = plan_reorders(
+        forecast["predictions"],
+        products,
+        budget,
+        horizon_days=horizon_days,
+        service_level=settings.FORECAST_SERVICE_LEVEL
+    )
+    return {"shop_id": shop_id, "forecast_generated_at": forecast["generated_at"], **plan}
+
+
+async def enrich_forecast(shop_id: str) -> Dict[str, Any]:
+    """
+    AI insights for a shop's sales (one LLM call); run in the background by forecast_insights.
+    Reads are strict: during an outage this raises, so the failure is retried rather
+    than cached as empty insights.
+    """
+    sales_data = aggregate_sales_data(await get_sales_cube(shop_id, days=30, strict=True))
+    if not sales_data:
+        return {"overall_insights": [], "risk_items": []}
+    products, inventory = await asyncio.gather(
+        get_shop_products(shop_id, strict=True),
+        get_shop_inventory(shop_id, strict=True)
+    )
+    return await generate_ai_forecast(shop_id, sales_data, products, inventory)
+
+
+async def _load_forecast(shop_id: str) -> Dict[str, Any]:
+    """
+    The nightly precomputed forecast (precompute_forecasts.py) when it is fresh and
+    no sales or stock changed since it was generated; otherwise compute live.
+    Changes are read from the rollup's and inventory's update times, so writes made
+    by other workers or before a restart count too.
+    """
+    try:
+        changes = await asyncio.gather(last_sales_change(shop_id, days=30), last_inventory_change(shop_id))
+    except Exception as e:
+        # Appwrite trouble: a live forecast would be built from an empty rollup, so
+        # keep serving the precomputed one unless this process saw a newer write
+        print(f"⚠️  Could not check sales changes for {shop_id}: {e}")
+        changes = ()
+
+    local = forecast_cache.last_invalidated(shop_id)
+    forecast = await load_forecast(
+        shop_id,
+        max_age=settings.FORECAST_PRECOMPUTE_MAX_AGE,
+        not_before=max(filter(None, (*changes, local)), default=None)
+    )
+    if forecast:
+        return forecast
+    # Strict: the result is cached for FORECAST_CACHE_TTL, so a read error must fail
+    # this request (503) rather than cache a forecast built from empty data
+    return await build_forecast(shop_id, strict=True)
+
+
+async def build_forecast(shop_id: str, strict: bool = False) -> Dict[str, Any]:
+    """
+    Compute a forecast from the rollup, catalog and inventory (uncached, without AI insights).
+    With `strict`, read errors raise instead of giving an empty forecast, so
+    callers that persist or cache the result never keep one computed during an outage.
     """
     print(f"\n📊 Generating forecast for shop: {shop_id}")
     
     # Fetch data
-    orders = await get_order_history(shop_id, days=30)
-    products = await get_shop_products(shop_id)
+    cube = await get_sales_cube(shop_id, days=30, strict=strict)
+    products = await get_shop_products(shop_id, strict=strict)
+    inventory = await get_shop_inventory(shop_id, strict=strict)
+    orders_analyzed = cube.total_orders()
     
-    print(f"   Orders analyzed: {len(orders)}")
+    print(f"   Orders analyzed: {orders_analyzed}")
     print(f"   Products tracked: {len(products)}")
     
-    # Aggregate sales
-    sales_data = aggregate_sales_data(orders)
-    
-    # Calculate simple forecast
-    simple_forecast = calculate_simple_forecast(sales_data, products)
+    return assemble_forecast(shop_id, cube, products, inventory)
+
+
+def assemble_forecast(
+    shop_id: str,
+    cube: SalesCube,
+    products: List[Dict],
+    inventory: Dict[str, Dict]
+) -> Dict[str, Any]:
+    """
+    The forecast response for an already loaded cube, catalog and inventory (no I/O;
+    used by bench_forecasting.py). Stockout fields are None for products without an
+    inventory row, and such products are left out of the risk counts.
+    """
+    orders_analyzed = cube.total_orders()
     
-    # Get AI insights if enabled
-    ai_insights = {"overall_insights": [], "risk_items": []}
-    if use_ai and sales_data:
-        ai_insights = await generate_ai_forecast(shop_id, sales_data, products)
+    # Statistical forecast (seasonal exponential smoothing, see forecast_engine.py)
+    simple_forecast = calculate_statistical_forecast(
+        cube,
+        products,
+        inventory,
+        forecast_days=7,
+        simulation_paths=settings.FORECAST_SIMULATION_PATHS,
+        service_level=settings.FORECAST_SERVICE_LEVEL
+    )
+    tracked = [p for p in simple_forecast if p["inventory_tracked"]]
+    price_by_id = {product.get("$id") or product.get("id"): product.get("price") or 0 for product in products}
     
     # Build response
     result = {
         "shop_id": shop_id,
         "generated_at": datetime.now().isoformat(),
+        "source": "live",
         "forecast_period_days": 7,
         "data_period_days": 30,
-        "orders_analyzed": len(orders),
+        "orders_analyzed": orders_analyzed,
         "products_tracked": len(products),
         "predictions": simple_forecast,
-        "insights": ai_insights.get("overall_insights", []),
-        "risk_items": [p["product_name"] for p in simple_forecast if p["days_until_stockout"] < 7],
+        "insights": [],
+        "risk_items": [p["product_name"] for p in tracked if p["days_until_stockout"] < 7],
         "summary": {
             "items_need_reorder": len([p for p in simple_forecast if p["reorder_recommended"]]),
-            "items_critical": len([p for p in simple_forecast if p["days_until_stockout"] < 3]),
+            "items_critical": len([p for p in tracked if p["days_until_stockout"] < 3]),
+            "items_untracked": len(simple_forecast) - len(tracked),
             "total_reorder_value": sum(
-                p["reorder_quantity"] * next(
-                    (prod.get("price", 0) for prod in products if prod.get("name") == p["product_name"]),
-                    0
-                )
+                p["reorder_quantity"] * price_by_id.get(p["product_id"], 0)
                 for p in simple_forecast if p["reorder_recommended"]
             )
         }
@@ -9,7 +9,7 @@ from difflib import SequenceMatcher
 from models.channel_order import ParsedOrderItem
 from services.ai_service import AIService
 from services.order_prompts import MATCH_MENU_PROMPT
-from config.appwrite import tables_db, DATABASE_ID
+from services.catalog_cache import catalog_cache
 
 
 # Common product aliases (Hindi/Hinglish → English)
@@ -106,14 +106,9 @@ def fuzzy_match_score(s1: str, s2: str) -> float:
 
 
 async def get_shop_inventory(shop_id: str) -> List[dict]:
-    """Fetch all products for a shop"""
+    """Fetch all products for a shop (served from the shared catalog cache)"""
     try:
-        # Fetch all products (Appwrite query syntax varies by SDK version)
-        result = tables_db.list_rows(DATABASE_ID, "products")
-        all_products = result.get("rows", [])
-        
-        # Filter by shop_id in Python (more reliable than query)
-        shop_products = [p for p in all_products if p.get("shop_id") == shop_id]
+        shop_products = await catalog_cache.get(shop_id)
         
         print(f"📊 Found {len(shop_products)} products for shop {shop_id}")
         return shop_products
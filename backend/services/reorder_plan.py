@@ -0,0 +1,162 @@
+"""
+Budget-Constrained Reorder Planning
+Spends a fixed restock budget where it avoids the most expected stockouts per rupee
+"""
+import math
+from statistics import NormalDist
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+# Standard normal upper tail Q(z) = P(Z > z) tabulated once; np.interp gives vectorized Q and its inverse
+_Z = np.linspace(-8, 8, 16001)
+_TAIL = np.array([0.5 * math.erfc(z / math.sqrt(2)) for z in _Z])
+
+# Bisection steps for the price threshold (relative precision ~1e-15)
+_BISECTION_STEPS = 50
+
+
+def _tail(z: np.ndarray) -> np.ndarray:
+    return np.interp(z, _Z, _TAIL)
+
+
+def _tail_inverse(p: np.ndarray) -> np.ndarray:
+    # _TAIL is decreasing; interp needs increasing x
+    return np.interp(p, _TAIL[::-1], _Z[::-1])
+
+
+def _shortfall(mean: np.ndarray, sd: np.ndarray, level: np.ndarray) -> np.ndarray:
+    """Expected units of demand above `level` (normal loss function): E[(D - level)+]"""
+    z = (level - mean) / sd
+    density = np.exp(-0.5 * z * z) / math.sqrt(2 * math.pi)
+    return sd * (density - z * _tail(z))
+
+
+def _units_short(value: float, digits: int) -> float:
+    # The loss function is >= 0 but can come out as a tiny negative (or -0.0) when
+    # the stock covers all demand; max() returns the +0.0 first argument on ties
+    return round(max(0.0, float(value)), digits)
+
+
+def plan_reorders(
+    predictions: List[Dict[str, Any]],
+    products: List[Dict[str, Any]],
+    budget: float,
+    horizon_days: int = 14,
+    service_level: float = 0.95
+) -> Dict[str, Any]:
+    """
+    Choose reorder quantities for a forecast's predictions within `budget`.
+
+    Demand over `horizon_days` is taken as normal, from each prediction's 7-day
+    mean and prediction interval (scaled by days and sqrt(days)). The u-th extra
+    unit of a product avoids a stockout of one unit with probability
+    P(D > stock + u - 1/2), which falls with u, so spending greedily on the best
+    avoided-units-per-rupee is optimal up to the last unit. The greedy solution is
+    the price threshold lambda at which every unit whose avoided probability is at
+    least lambda * unit price gets bought; lambda is found by bisection (O(products)
+    per step) and leftover budget goes to the best remaining single units.
+    No product is stocked beyond the service_level quantile of its demand.
+    The catalog price is used as unit cost (as in total_reorder_value).
+    Products without inventory (current_stock None) are not planned; they are
+    listed in the summary's `untracked_items`.
+    """
+    untracked = [p["product_name"] for p in predictions if p["current_stock"] is None]
+    predictions = [p for p in predictions if p["current_stock"] is not None]
+    price_by_id = {product.get("$id") or product.get("id"): product.get("price") or 0 for product in products}
+    intervals = [p.get("prediction_interval_7d") or {} for p in predictions]
+    z_by_level = {}
+    for interval in intervals:
+        level = interval.get("level", 0.8)
+        if level not in z_by_level:
+            z_by_level[level] = NormalDist().inv_cdf(0.5 + level / 2)
+    z_interval = np.array([z_by_level[interval.get("level", 0.8)] for interval in intervals])
+    mean_7d = np.array([p["predicted_demand_7d"] for p in predictions], dtype=float)
+    upper_7d = np.array([interval.get("upper", 0) for interval in intervals], dtype=float)
+
+    scale = horizon_days / 7
+    mean = mean_7d * scale
+    sd = (upper_7d - mean_7d) / z_interval * math.sqrt(scale)
+    # Degenerate intervals (no spread) fall back to Poisson-like spread
+    sd = np.where(sd > 1e-6, sd, np.sqrt(np.maximum(mean, 0.25)))
+    stock = np.array([p["current_stock"] for p in predictions], dtype=float)
+    cost = np.array([price_by_id.get(p["product_id"], 0) for p in predictions], dtype=float)
+
+    def units(threshold: float) -> np.ndarray:
+        # Largest u with P(D > stock + u - 1/2) >= max(threshold * cost, 1 - service_level)
+        p = np.maximum(threshold * cost, 1 - service_level)
+        u = np.floor(mean + sd * _tail_inverse(np.minimum(p, 1.0)) - stock + 0.5)
+        return np.maximum(np.where(p >= 1, 0, u), 0)
+
+    # Unconstrained plan: every product up to its service-level cover
+    cap = units(0.0)
+    quantity = cap.copy()
+    if quantity @ cost > budget:
+        # Smallest threshold whose plan fits; everything is unaffordable above 1 / min(cost)
+        low, high = 0.0, 1 / cost[cost > 0].min()
+        for _ in range(_BISECTION_STEPS):
+            middle = (low + high) / 2
+            if units(middle) @ cost > budget:
+                low = middle
+            else:
+                high = middle
+        quantity = units(high)
+
+        # Fill what is left with the best next units that still fit
+        remaining = budget - quantity @ cost
+        gain = _tail((stock + quantity + 0.5 - mean) / sd)
+        with np.errstate(divide="ignore"):
+            ratio = np.where((quantity < cap) & (cost > 0), gain / cost, -1)
+        for i in np.argsort(-ratio, kind="stable").tolist():
+            if ratio[i] < 0:
+                break
+            if cost[i] <= remaining:
+                quantity[i] += 1
+                remaining -= cost[i]
+
+    short_before = _shortfall(mean, sd, stock)
+    short_after = _shortfall(mean, sd, stock + quantity)
+    risk_before = _tail((stock - mean) / sd)
+    risk_after = _tail((stock + quantity - mean) / sd)
+    spent = float(quantity @ cost)
+
+    # First unit's avoided stockout per rupee ranks the plan (most urgent first)
+    with np.errstate(divide="ignore"):
+        priority = np.where(cost > 0, _tail((stock + 0.5 - mean) / sd) / cost, np.inf)
+    items = []
+    for i in np.argsort(-priority, kind="stable").tolist():
+        if quantity[i] <= 0:
+            continue
+        prediction = predictions[i]
+        items.append({
+            "product_id": prediction["product_id"],
+            "product_name": prediction["product_name"],
+            "current_stock": prediction["current_stock"],
+            "unit_price": float(cost[i]),
+            "reorder_quantity": int(quantity[i]),
+            "cost": round(float(quantity[i] * cost[i]), 2),
+            "expected_units_short": {"before": _units_short(short_before[i], 2), "after": _units_short(short_after[i], 2)},
+            "stockout_probability": {"before": round(float(risk_before[i]), 3), "after": round(float(risk_after[i]), 3)},
+        })
+
+    underfunded = [predictions[i]["product_name"] for i in np.flatnonzero(quantity < cap).tolist()]
+    return {
+        "budget": budget,
+        "spent": round(spent, 2),
+        "remaining": round(budget - spent, 2),
+        "horizon_days": horizon_days,
+        "service_level": service_level,
+        "items": items,
+        "summary": {
+            "items_planned": len(items),
+            "units_planned": int(quantity.sum()),
+            "expected_units_short_before": _units_short(short_before.sum(), 1),
+            "expected_units_short_after": _units_short(short_after.sum(), 1),
+            "expected_stockouts_before": round(float(risk_before.sum()), 1),
+            "expected_stockouts_after": round(float(risk_after.sum()), 1),
+            "unconstrained_cost": round(float(cap @ cost), 2),
+            "underfunded_items": underfunded,
+            "untracked_items": untracked,
+        }
+    }
@@ -0,0 +1,280 @@
+"""
+Async Data Access Layer
+Non-blocking wrappers around the Appwrite TablesDB service
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from appwrite.query import Query
+
+from config.appwrite import tables_db
+from config.settings import settings
+from services.resilience import appwrite_policy
+
+
+# Appwrite caps the number of values in a single equal() query
+MAX_QUERY_VALUES = 100
+
+# Bounded pool for blocking SDK calls - caps concurrent Appwrite requests per worker
+_executor = ThreadPoolExecutor(
+    max_workers=settings.APPWRITE_MAX_WORKERS,
+    thread_name_prefix="appwrite"
+)
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking callable on the Appwrite executor without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+class AsyncTablesDB:
+    """
+    Async mirror of the TablesDB row API.
+    Same method names and keyword arguments as the SDK, so call sites only add `await`.
+    Every call runs under the shared resilience policy (deadline, read retries, breaker).
+    """
+
+    def __init__(self, sync_db, policy=appwrite_policy):
+        self._db = sync_db
+        self._policy = policy
+
+    async def _call(self, operation: str, idempotent: bool, **kwargs) -> Any:
+        func = getattr(self._db, operation)
+        return await self._policy.call(
+            operation,
+            lambda: run_blocking(func, **kwargs),
+            idempotent=idempotent
+        )
+
+    async def list_rows(
+        self,
+        database_id: str,
+        table_id: str,
+        queries: Optional[List[str]] = None,
+        total: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        return await self._call(
+            "list_rows",
+            idempotent=True,
+            database_id=database_id,
+            table_id=table_id,
+            queries=queries,
+            total=total
+        )
+
+    async def list_page(
+        self,
+        database_id: str,
+        table_id: str,
+        queries: Optional[List[str]] = None,
+        limit: int = 25,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page of rows.
+        Offset paging by default. Passing `cursor` (empty string for the first page)
+        switches to keyset paging: newest first on ($createdAt, $id), cursorAfter the
+        last row ID, and no total count - so every page costs the same however deep.
+        """
+        queries = list(queries or [])
+        queries.append(Query.limit(limit))
+
+        if cursor is None:
+            queries.append(Query.offset(offset))
+            result = await self.list_rows(database_id, table_id, queries)
+            return {"total": result['total'], "rows": result['rows'], "next_cursor": None}
+
+        queries.append(Query.order_desc("$createdAt"))
+        queries.append(Query.order_desc("$id"))
+        if cursor:
+            queries.append(Query.cursor_after(cursor))
+
+        result = await self.list_rows(database_id, table_id, queries, total=False)
+        rows = result['rows']
+        return {
+            "total": None,
+            "rows": rows,
+            "next_cursor": rows[-1]['$id'] if len(rows) == limit else None
+        }
+
+    async def iter_rows(
+        self,
+        database_id: str,
+        table_id: str,
+        queries: Optional[List[str]] = None,
+        page_size: int = 100
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream every row matching `queries`, one page at a time.
+        Filters run server-side; pages are chained with cursorAfter so
+        scans past the first page stay correct and cheap.
+        """
+        cursor = None
+        while True:
+            page_queries = list(queries or [])
+            page_queries.append(Query.limit(page_size))
+            if cursor:
+                page_queries.append(Query.cursor_after(cursor))
+
+            result = await self.list_rows(database_id, table_id, page_queries, total=False)
+            rows = result['rows']
+            for row in rows:
+                yield row
+
+            if len(rows) < page_size:
+                return
+            cursor = rows[-1]['$id']
+
+    async def get_many(
+        self,
+        database_id: str,
+        table_id: str,
+        row_ids: List[str],
+        chunk_size: int = MAX_QUERY_VALUES
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch rows by ID in a few round-trips instead of one get_row per ID.
+        IDs are de-duplicated and split into equal("$id") chunks fetched in parallel.
+        Rows come back in request order; IDs that do not exist are skipped.
+        """
+        unique_ids = list(dict.fromkeys(row_ids))
+        chunks = [unique_ids[i:i + chunk_size] for i in range(0, len(unique_ids), chunk_size)]
+
+        results = await asyncio.gather(*(
+            self.list_rows(
+                database_id,
+                table_id,
+                [Query.equal("$id", chunk), Query.limit(len(chunk))],
+                total=False
+            )
+            for chunk in chunks
+        ))
+
+        by_id = {row['$id']: row for result in results for row in result['rows']}
+        return [by_id[row_id] for row_id in unique_ids if row_id in by_id]
+
+    async def get_row(self, database_id: str, table_id: str, row_id: str) -> Dict[str, Any]:
+        return await self._call(
+            "get_row",
+            idempotent=True,
+            database_id=database_id,
+            table_id=table_id,
+            row_id=row_id
+        )
+
+    async def create_row(
+        self,
+        database_id: str,
+        table_id: str,
+        row_id: str,
+        data: dict
+    ) -> Dict[str, Any]:
+        return await self._call(
+            "create_row",
+            idempotent=False,
+            database_id=database_id,
+            table_id=table_id,
+            row_id=row_id,
+            data=data
+        )
+
+    async def create_rows(
+        self,
+        database_id: str,
+        table_id: str,
+        rows: List[dict]
+    ) -> Dict[str, Any]:
+        return await self._call(
+            "create_rows",
+            idempotent=False,
+            database_id=database_id,
+            table_id=table_id,
+            rows=rows
+        )
+
+    async def update_row(
+        self,
+        database_id: str,
+        table_id: str,
+        row_id: str,
+        data: dict
+    ) -> Dict[str, Any]:
+        return await self._call(
+            "update_row",
+            idempotent=False,
+            database_id=database_id,
+            table_id=table_id,
+            row_id=row_id,
+            data=data
+        )
+
+    async def upsert_row(
+        self,
+        database_id: str,
+        table_id: str,
+        row_id: str,
+        data: dict
+    ) -> Dict[str, Any]:
+        return await self._call(
+            "upsert_row",
+            idempotent=False,
+            database_id=database_id,
+            table_id=table_id,
+            row_id=row_id,
+            data=data
+        )
+
+    async def increment_row_column(
+        self,
+        database_id: str,
+        table_id: str,
+        row_id: str,
+        column: str,
+        value: float
+    ) -> Dict[str, Any]:
+        return await self._call(
+            "increment_row_column",
+            idempotent=False,
+            database_id=database_id,
+            table_id=table_id,
+            row_id=row_id,
+            column=column,
+            value=value
+        )
+
+    async def decrement_row_column(
+        self,
+        database_id: str,
+        table_id: str,
+        row_id: str,
+        column: str,
+        value: float,
+        min: Optional[float] = None
+    ) -> Dict[str, Any]:
+        return await self._call(
+            "decrement_row_column",
+            idempotent=False,
+            database_id=database_id,
+            table_id=table_id,
+            row_id=row_id,
+            column=column,
+            value=value,
+            min=min
+        )
+
+    async def delete_row(self, database_id: str, table_id: str, row_id: str) -> Dict[str, Any]:
+        return await self._call(
+            "delete_row",
+            idempotent=False,
+            database_id=database_id,
+            table_id=table_id,
+            row_id=row_id
+        )
+
+
+# Shared instance used by routers and services
+db = AsyncTablesDB(tables_db)
@@ -0,0 +1,227 @@
+"""
+Appwrite Call Resilience
+Per-operation deadlines, jittered retries for idempotent reads and a circuit breaker
+"""
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from appwrite.exception import AppwriteException
+
+from config.settings import settings
+
+
+# Status codes worth retrying / counting against the backend's health.
+# None covers network errors raised before any response arrived.
+TRANSIENT_CODES = {None, 0, 408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(AppwriteException):
+    """Raised without calling Appwrite while the breaker is open"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Appwrite unavailable (circuit open, retry in {retry_in:.0f}s)", 503)
+        self.retry_in = retry_in
+
+
+class DeadlineExceededError(AppwriteException):
+    """An attempt ran past its per-operation deadline"""
+
+    def __init__(self, operation: str, deadline: float):
+        super().__init__(f"Appwrite {operation} timed out after {deadline:.1f}s", 504)
+
+
+def unavailable_error(error: BaseException) -> Optional[AppwriteException]:
+    """
+    The 503/504 AppwriteException behind `error`, if any: the error itself or one in
+    its __cause__/__context__ chain (routers re-raise Appwrite errors as HTTPException).
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, AppwriteException) and error.code in (503, 504):
+            return error
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    return isinstance(error, AppwriteException) and error.code in TRANSIENT_CODES
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive transient call failures;
+    open -> half_open after `reset_timeout` seconds, letting one probe through;
+    half_open -> closed on probe success, back to open on probe failure.
+    Only touched from the event loop, so no locking.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.transitions: Dict[str, int] = {}
+        self.last_transition_at: Optional[float] = None
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        edge = f"{self.state}->{state}"
+        self.transitions[edge] = self.transitions.get(edge, 0) + 1
+        self.last_transition_at = time.time()
+        print(f"⚡ Appwrite circuit {edge}")
+        self.state = state
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError if the call should not reach Appwrite.
+        Returns True if this call is the half-open probe.
+        """
+        if self.state == "open":
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(self.reset_timeout - elapsed)
+            self._set_state("half_open")
+
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(0)
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def abandon_probe(self):
+        """The probe ended without an outcome (cancelled): reopen so a later call probes again"""
+        self._probe_in_flight = False
+        self._opened_at = time.monotonic()
+        self._set_state("open")
+
+    def record_success(self):
+        self._probe_in_flight = False
+        self._failures = 0
+        self._set_state("closed")
+
+    def record_failure(self, error: Exception):
+        self._probe_in_flight = False
+        if not is_transient(error):
+            # The backend answered (404, validation error, ...) - it is healthy
+            self._failures = 0
+            self._set_state("closed")
+            return
+
+        self._failures += 1
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state("open")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions),
+            "last_transition_at": self.last_transition_at,
+        }
+
+
+class ResiliencePolicy:
+    """
+    Wraps one logical Appwrite operation.
+    Every attempt gets a deadline; reads are retried on transient errors with
+    full-jitter exponential backoff; writes run once since they are not idempotent.
+    The breaker sees one outcome per logical call (after its retries), so
+    APPWRITE_BREAKER_THRESHOLD counts failed calls, not attempts; a failed
+    half-open probe is recorded at once and not retried.
+    A timed-out attempt keeps its executor thread until the HTTP read timeout,
+    so the deadline bounds caller latency rather than backend work.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        read_deadline: float,
+        write_deadline: float,
+        retry_attempts: int,
+        base_delay: float,
+        max_delay: float
+    ):
+        self.breaker = breaker
+        self.read_deadline = read_deadline
+        self.write_deadline = write_deadline
+        self.retry_attempts = max(1, retry_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._ops: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, operation: str, field: str):
+        counters = self._ops.setdefault(
+            operation, {"calls": 0, "retries": 0, "timeouts": 0, "failures": 0}
+        )
+        counters[field] += 1
+
+    async def call(
+        self,
+        operation: str,
+        func: Callable[[], Awaitable[Any]],
+        idempotent: bool
+    ) -> Any:
+        """Run `func` (a zero-arg coroutine factory) under the policy"""
+        self._count(operation, "calls")
+        deadline = self.read_deadline if idempotent else self.write_deadline
+        attempts = self.retry_attempts if idempotent else 1
+
+        for attempt in range(attempts):
+            probe = self.breaker.before_call()
+            try:
+                result = await asyncio.wait_for(func(), timeout=deadline)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self._count(operation, "timeouts")
+                    e = DeadlineExceededError(operation, deadline)
+                if not is_transient(e) or attempt == attempts - 1 or self.breaker.state == "half_open":
+                    self.breaker.record_failure(e)
+                    self._count(operation, "failures")
+                    raise e
+                self._count(operation, "retries")
+                await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+                continue
+            except BaseException:
+                # Cancelled mid-attempt: without this the probe flag stays set and
+                # half_open rejects every later call
+                if probe:
+                    self.breaker.abandon_probe()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.stats(),
+            "operations": {op: dict(counters) for op, counters in self._ops.items()},
+        }
+
+
+appwrite_policy = ResiliencePolicy(
+    breaker=CircuitBreaker(
+        failure_threshold=settings.APPWRITE_BREAKER_THRESHOLD,
+        reset_timeout=settings.APPWRITE_BREAKER_RESET
+    ),
+    read_deadline=settings.APPWRITE_READ_DEADLINE,
+    write_deadline=settings.APPWRITE_WRITE_DEADLINE,
+    retry_attempts=settings.APPWRITE_RETRY_ATTEMPTS,
+    base_delay=settings.APPWRITE_RETRY_BASE_DELAY,
+    max_delay=settings.APPWRITE_RETRY_MAX_DELAY
+)
@@ -0,0 +1,197 @@
+"""
+Sales Cube
+Array-backed product x day sales for one shop's window, built once from daily_sales and shared
+"""
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from services.daily_sales import ALL_PRODUCTS, get_daily_sales
+from services.single_flight import single_flight
+
+
+def window_start(days: int) -> date:
+    """First day of a window covering the last `days` complete UTC days"""
+    return datetime.now(timezone.utc).date() - timedelta(days=days)
+
+
+class SalesCube:
+    """
+    One shop's sales over [start, start + days): quantity, revenue and order_count
+    matrices with a row per product_id that sold in the window (unlinked lines use
+    daily_sales' "name:<name>" keys) and a column per day. Shop-wide '*' rows are
+    kept as per-day vectors. Read-only once built - it is shared between callers.
+    """
+
+    def __init__(self, shop_id: str, start: date, days: int, rollup: List[Dict[str, Any]]):
+        self.shop_id = shop_id
+        self.start = start
+        self.days = days
+
+        column_of = {(start + timedelta(days=d)).isoformat(): d for d in range(days)}
+        self.index: Dict[str, int] = {}
+        self.product_ids: List[str] = []
+        self.names: List[str] = []
+
+        cells, quantities, revenues, counts = [], [], [], []
+        shop_cols, shop_counts = [], []
+        for row in rollup:
+            col = column_of.get(row["date"])
+            if col is None:
+                continue
+            product_id = row["product_id"]
+            if product_id == ALL_PRODUCTS:
+                shop_cols.append(col)
+                shop_counts.append(row.get("order_count", 0))
+                continue
+            i = self.index.get(product_id)
+            if i is None:
+                i = self.index[product_id] = len(self.product_ids)
+                self.product_ids.append(product_id)
+                self.names.append(row.get("product_name") or "Unknown")
+            cells.append(i * days + col)
+            quantities.append(row.get("quantity", 0))
+            revenues.append(row.get("revenue", 0))
+            counts.append(row.get("order_count", 0))
+
+        shape = (len(self.product_ids), days)
+        cells = np.array(cells, dtype=np.intp)
+
+        def grid(values, dtype):
+            weights = np.array(values, dtype=float)
+            return np.bincount(cells, weights=weights, minlength=shape[0] * days).reshape(shape).astype(dtype)
+
+        self.quantity = grid(quantities, np.float32)
+        self.revenue = grid(revenues, np.float32)
+        self.order_count = grid(counts, np.int32)
+        self.shop_orders = np.bincount(
+            np.array(shop_cols, dtype=np.intp), weights=np.array(shop_counts, dtype=float), minlength=days
+        ).astype(np.int32)
+
+    @property
+    def end(self) -> date:
+        """First day after the window (the forecast starts here)"""
+        return self.start + timedelta(days=self.days)
+
+    def dates(self) -> List[str]:
+        return [(self.start + timedelta(days=d)).isoformat() for d in range(self.days)]
+
+    def total_orders(self) -> int:
+        return int(self.shop_orders.sum())
+
+    def series(self, product_id: str) -> Optional[np.ndarray]:
+        """Daily quantity for one product (O(1) lookup), or None if it did not sell"""
+        i = self.index.get(product_id)
+        return None if i is None else self.quantity[i]
+
+    def product_totals(self) -> Dict[str, Dict[str, float]]:
+        """Window totals per product_id: name, quantity, revenue, order_count"""
+        quantity = self.quantity.sum(axis=1, dtype=np.float64).tolist()
+        revenue = self.revenue.sum(axis=1, dtype=np.float64).tolist()
+        orders = self.order_count.sum(axis=1).tolist()
+        return {
+            product_id: {
+                "product_name": self.names[i],
+                "total_quantity": quantity[i],
+                "total_revenue": revenue[i],
+                "order_count": orders[i]
+            }
+            for i, product_id in enumerate(self.product_ids)
+        }
+
+    def aligned(self, products: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (quantity [catalog products x days], order counts [catalog products]) in catalog
+        order. Cube rows match catalog products by product_id; rows whose id is not in
+        the catalog (unlinked "name:" lines, re-created products) fall back to name.
+        """
+        catalog_ids, catalog_names = {}, {}
+        for i, product in enumerate(products):
+            product_id = product.get("$id") or product.get("id")
+            if product_id:
+                catalog_ids.setdefault(product_id, i)
+            catalog_names.setdefault((product.get("name") or "").lower(), i)
+
+        sources, targets = [], []
+        for row, product_id in enumerate(self.product_ids):
+            target = catalog_ids.get(product_id)
+            if target is None:
+                target = catalog_names.get(self.names[row].lower())
+            if target is not None:
+                sources.append(row)
+                targets.append(target)
+
+        matrix = np.zeros((len(products), self.days))
+        order_counts = np.zeros(len(products))
+        if sources:
+            np.add.at(matrix, targets, self.quantity[sources])
+            np.add.at(order_counts, targets, self.order_count[sources].sum(axis=1))
+        return matrix, order_counts
+
+
+class SalesCubeCache:
+    """
+    LRU + TTL cache of cubes keyed by (shop_id, window). The window start moves
+    with the UTC date, so a new day builds a new cube. apply_order_change calls
+    invalidate() when a shop's sales change.
+    """
+
+    def __init__(self, ttl_seconds: float, max_shops: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_shops = max_shops
+        self._entries: "OrderedDict[Tuple[str, str, int], tuple[float, SalesCube]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, shop_id: str, days: int = 30) -> SalesCube:
+        """The shop's cube for the last `days` complete UTC days"""
+        start = window_start(days)
+        key = (shop_id, start.isoformat(), days)
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        version = self._versions.get(shop_id, 0)
+        cube = await single_flight.do(("sales_cube",) + key, self._build, shop_id, start, days)
+
+        if self._versions.get(shop_id, 0) == version:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, cube)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_shops:
+                self._entries.popitem(last=False)
+        return cube
+
+    async def _build(self, shop_id: str, start: date, days: int) -> SalesCube:
+        rollup = await get_daily_sales(shop_id, days=days)
+        return SalesCube(shop_id, start, days, rollup)
+
+    def invalidate(self, shop_id: str):
+        self._versions[shop_id] = self._versions.get(shop_id, 0) + 1
+        for key in [key for key in self._entries if key[0] == shop_id]:
+            del self._entries[key]
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cubes_cached": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+sales_cube_cache = SalesCubeCache(
+    ttl_seconds=settings.SALES_CUBE_TTL,
+    max_shops=settings.SALES_CUBE_MAX_SHOPS
+)
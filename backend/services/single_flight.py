@@ -0,0 +1,63 @@
+"""
+Single-Flight Request Coalescing
+Concurrent identical reads share one in-flight call instead of each hitting Appwrite / the forecaster
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key.
+    The first caller for a key starts the work as a task; callers arriving while it
+    runs await the same task. Nothing is cached - once the call settles the key is
+    free again. Keys are tuples whose first element names the kind of call, which
+    is what stats() groups by.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Tuple[Hashable, ...], asyncio.Task] = {}
+        self.executions: Dict[str, int] = {}
+        self.coalesced: Dict[str, int] = {}
+
+    async def do(
+        self,
+        key: Tuple[Hashable, ...],
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        **kwargs
+    ) -> Any:
+        """Run `func(*args, **kwargs)` once for all concurrent callers with the same key"""
+        kind = str(key[0])
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced[kind] = self.coalesced.get(kind, 0) + 1
+        else:
+            self.executions[kind] = self.executions.get(kind, 0) + 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        # Shield so one caller disconnecting does not cancel the work for the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Tuple[Hashable, ...], task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        kinds = sorted(set(self.executions) | set(self.coalesced))
+        return {
+            "in_flight": len(self._calls),
+            "coalesced_total": sum(self.coalesced.values()),
+            "by_kind": {
+                kind: {
+                    "executions": self.executions.get(kind, 0),
+                    "coalesced": self.coalesced.get(kind, 0),
+                }
+                for kind in kinds
+            },
+        }
+
+
+single_flight = SingleFlight()
@@ -59,6 +59,8 @@ COLLECTIONS = {
         'indexes': [
             {'key': 'shop_id_idx', 'type': 'key', 'attributes': ['shop_id']},
             {'key': 'category_idx', 'type': 'key', 'attributes': ['category']},
+            {'key': 'shop_active_idx', 'type': 'key', 'attributes': ['shop_id', 'is_active']},
+            {'key': 'shop_category_idx', 'type': 'key', 'attributes': ['shop_id', 'category']},
         ]
     },
     'inventory': {
@@ -69,10 +71,12 @@ COLLECTIONS = {
             {'key': 'stock_quantity', 'type': 'double', 'required': True},
             {'key': 'min_stock_level', 'type': 'double', 'required': True},
             {'key': 'last_restock_date', 'type': 'datetime', 'required': False},
+            {'key': 'is_low_stock', 'type': 'boolean', 'required': False, 'default': False},  # stock_quantity <= min_stock_level
         ],
         'indexes': [
             {'key': 'shop_id_idx', 'type': 'key', 'attributes': ['shop_id']},
             {'key': 'product_id_idx', 'type': 'key', 'attributes': ['product_id']},
+            {'key': 'shop_low_stock_idx', 'type': 'key', 'attributes': ['shop_id', 'is_low_stock']},
         ]
     },
     'customers': {
@@ -88,6 +92,7 @@ COLLECTIONS = {
         'indexes': [
             {'key': 'shop_id_idx', 'type': 'key', 'attributes': ['shop_id']},
             {'key': 'phone_idx', 'type': 'key', 'attributes': ['phone']},
+            {'key': 'shop_phone_idx', 'type': 'key', 'attributes': ['shop_id', 'phone']},
         ]
     },
     'orders': {
@@ -110,6 +115,25 @@ COLLECTIONS = {
             {'key': 'customer_id_idx', 'type': 'key', 'attributes': ['customer_id']},
             {'key': 'order_number_idx', 'type': 'unique', 'attributes': ['order_number']},
             {'key': 'status_idx', 'type': 'key', 'attributes': ['status']},
+            {'key': 'shop_created_idx', 'type': 'key', 'attributes': ['shop_id', '$createdAt']},
+            {'key': 'shop_status_created_idx', 'type': 'key', 'attributes': ['shop_id', 'status', '$createdAt']},
+            {'key': 'customer_created_idx', 'type': 'key', 'attributes': ['customer_id', '$createdAt']},
+        ]
+    },
+    'daily_sales': {
+        'name': 'Daily Sales',
+        'attributes': [
+            {'key': 'shop_id', 'type': 'string', 'size': 255, 'required': True},
+            {'key': 'product_id', 'type': 'string', 'size': 255, 'required': True},  # '*' = whole shop
+            {'key': 'product_name', 'type': 'string', 'size': 255, 'required': True},
+            {'key': 'date', 'type': 'string', 'size': 10, 'required': True},  # YYYY-MM-DD (UTC)
+            {'key': 'quantity', 'type': 'double', 'required': False, 'default': 0.0},
+            {'key': 'revenue', 'type': 'double', 'required': False, 'default': 0.0},
+            {'key': 'order_count', 'type': 'integer', 'required': False, 'default': 0},
+        ],
+        'indexes': [
+            {'key': 'shop_date_idx', 'type': 'key', 'attributes': ['shop_id', 'date']},
+            {'key': 'shop_product_date_idx', 'type': 'key', 'attributes': ['shop_id', 'product_id', 'date']},
         ]
     },
     'deliveries': {
@@ -137,6 +161,7 @@ COLLECTIONS = {
             {'key': 'shop_id_idx', 'type': 'key', 'attributes': ['shop_id']},
             {'key': 'batch_number_idx', 'type': 'unique', 'attributes': ['batch_number']},
             {'key': 'status_idx', 'type': 'key', 'attributes': ['status']},
+            {'key': 'shop_status_created_idx', 'type': 'key', 'attributes': ['shop_id', 'status', '$createdAt']},
         ]
     },
     'gst_reports': {
@@ -155,6 +180,23 @@ COLLECTIONS = {
         'indexes': [
             {'key': 'shop_id_idx', 'type': 'key', 'attributes': ['shop_id']},
             {'key': 'period_idx', 'type': 'key', 'attributes': ['period']},
+            {'key': 'shop_period_idx', 'type': 'key', 'attributes': ['shop_id', 'period']},
+        ]
+    },
+    'ai_insights': {
+        'name': 'AI Insights',
+        'attributes': [
+            {'key': 'shop_id', 'type': 'string', 'size': 255, 'required': True},
+            {'key': 'type', 'type': 'string', 'size': 50, 'required': True},  # demand_forecast, inventory_alert, ...
+            {'key': 'message', 'type': 'string', 'size': 1000, 'required': False},
+            {'key': 'data', 'type': 'string', 'size': 5000000, 'required': False},  # JSON (full forecast payload)
+            {'key': 'severity', 'type': 'string', 'size': 20, 'required': False},  # low, medium, high
+            {'key': 'is_read', 'type': 'boolean', 'required': False, 'default': False},
+            {'key': 'generated_at', 'type': 'datetime', 'required': False},
+            {'key': 'compute_ms', 'type': 'double', 'required': False},
+        ],
+        'indexes': [
+            {'key': 'shop_type_idx', 'type': 'key', 'attributes': ['shop_id', 'type']},
         ]
     },
 }
@@ -186,6 +228,64 @@ def create_database():
         return None
 
 
+def create_column(database_id, collection_id, attr):
+    """Create one column from a COLLECTIONS attribute definition"""
+    attr_type = attr['type']
+    key = attr['key']
+    
+    if attr_type == 'string':
+        tables_db.create_string_column(
+            database_id=database_id,
+            table_id=collection_id,
+            key=key,
+            size=attr['size'],
+            required=attr['required'],
+            default=attr.get('default')
+        )
+    elif attr_type == 'integer':
+        tables_db.create_integer_column(
+            database_id=database_id,
+            table_id=collection_id,
+            key=key,
+            required=attr['required'],
+            default=attr.get('default')
+        )
+    elif attr_type == 'double':
+        tables_db.create_float_column(
+            database_id=database_id,
+            table_id=collection_id,
+            key=key,
+            required=attr['required'],
+            default=attr.get('default')
+        )
+    elif attr_type == 'boolean':
+        tables_db.create_boolean_column(
+            database_id=database_id,
+            table_id=collection_id,
+            key=key,
+            required=attr['required'],
+            default=attr.get('default')
+        )
+    elif attr_type == 'datetime':
+        tables_db.create_datetime_column(
+            database_id=database_id,
+            table_id=collection_id,
+            key=key,
+            required=attr['required']
+        )
+
+
+def create_index(database_id, collection_id, idx):
+    """Create one index from a COLLECTIONS index definition"""
+    tables_db.create_index(
+        database_id=database_id,
+        table_id=collection_id,
+        key=idx['key'],
+        type=idx['type'],
+        columns=idx['attributes']
+    )
+
+
 def create_collection(database_id, collection_id, schema):
     """Create a collection with attributes and indexes"""
     try:
@@ -205,52 +305,10 @@ def create_collection(database_id, collection_id, schema):
         
         # Create attributes
         for attr in schema['attributes']:
+            key = attr['key']
             try:
-                attr_type = attr['type']
-                key = attr['key']
-                
-                if attr_type == 'string':
-                    tables_db.create_string_column(
-                        database_id=database_id,
-                        table_id=collection_id,
-                        key=key,
-                        size=attr['size'],
-                        required=attr['required'],
-                        default=attr.get('default')
-                    )
-                elif attr_type == 'integer':
-                    tables_db.create_integer_column(
-                        database_id=database_id,
-                        table_id=collection_id,
-                        key=key,
-                        required=attr['required'],
-                        default=attr.get('default')
-                    )
-                elif attr_type == 'double':
-                    tables_db.create_float_column(
-                        database_id=database_id,
-                        table_id=collection_id,
-                        key=key,
-                        required=attr['required'],
-                        default=attr.get('default')
-                    )
-                elif attr_type == 'boolean':
-                    tables_db.create_boolean_column(
-                        database_id=database_id,
-                        table_id=collection_id,
-                        key=key,
-                        required=attr['required'],
-                        default=attr.get('default')
-                    )
-                elif attr_type == 'datetime':
-                    tables_db.create_datetime_column(
-                        database_id=database_id,
-                        table_id=collection_id,
-                        key=key,
-                        required=attr['required']
-                    )
-                
-                print(f"    • Added attribute: {key} ({attr_type})")
+                create_column(database_id, collection_id, attr)
+                print(f"    • Added attribute: {key} ({attr['type']})")
             except AppwriteException as e:
                 if 'already exists' not in str(e).lower():
                     print(f"    ⚠️  Error creating attribute {key}: {e}")
@@ -263,13 +321,7 @@ def create_collection(database_id, collection_id, schema):
         # Create indexes
         for idx in schema.get('indexes', []):
             try:
-                tables_db.create_index(
-                    database_id=database_id,
-                    table_id=collection_id,
-                    key=idx['key'],
-                    type=idx['type'],
-                    columns=idx['attributes']
-                )
+                create_index(database_id, collection_id, idx)
                 print(f"    • Added index: {idx['key']}")
             except AppwriteException as e:
                 if 'already exists' not in str(e).lower():
@@ -364,3 +416,7 @@ def main():
         print(f"  • {coll_id}")
     print("\n🎉 You're all set! Start building your features.\n")
 
+
+
+if __name__ == "__main__":
+    main()
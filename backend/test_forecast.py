@@ -26,7 +26,7 @@ async def test_forecast():
                 print(f"   {status} {pred['product_name']}: "
                       f"{pred['predicted_demand_7d']:.0f} units/week, "
                       f"Stock: {pred['current_stock']}, "
-                      f"Days left: {pred['days_until_stockout']:.0f}")
+                      f"Days left: {pred['days_until_stockout'] if pred['days_until_stockout'] is not None else '-'}")
             
             print(f"\n💡 Insights:")
             for insight in data.get('insights', [])[:3]:
@@ -0,0 +1,52 @@
+"""
+Circuit breaker recovery (python -m unittest discover tests)
+"""
+import asyncio
+import os
+import unittest
+
+os.environ.setdefault("FASTROUTER_API_KEY", "test")
+
+from appwrite.exception import AppwriteException
+
+from services.resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy
+
+
+class CancelledProbeTest(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_probe_does_not_block_later_calls(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        policy = ResiliencePolicy(breaker, 1, 1, retry_attempts=1, base_delay=0, max_delay=0)
+
+        async def fail():
+            raise AppwriteException("unavailable", 503)
+
+        with self.assertRaises(AppwriteException):
+            await policy.call("get_row", fail, idempotent=True)
+        self.assertEqual(breaker.state, "open")
+
+        # reset_timeout=0: the next call is the half-open probe; cancel it mid-flight
+        probe = asyncio.create_task(policy.call("get_row", lambda: asyncio.sleep(10), idempotent=True))
+        await asyncio.sleep(0.01)
+        self.assertEqual(breaker.state, "half_open")
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+
+        self.assertEqual(breaker.state, "open")
+
+        async def ok():
+            return "row"
+
+        self.assertEqual(await policy.call("get_row", ok, idempotent=True), "row")
+        self.assertEqual(breaker.state, "closed")
+
+    async def test_probe_in_flight_rejects_other_calls(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure(AppwriteException("unavailable", 503))
+        self.assertTrue(breaker.before_call())
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+PooledTransport must not carry cookies between requests
+(the pool is shared by the admin client and every user's session client).
+
+    python -m unittest discover tests
+"""
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("FASTROUTER_API_KEY", "test")
+
+from config.transport import PooledClient, PooledTransport
+
+
+class CookieEchoHandler(BaseHTTPRequestHandler):
+    """Sets a session cookie on /login; echoes the request's Cookie header otherwise"""
+
+    def do_GET(self):
+        self.reply('{"cookie": "%s"}' % (self.headers.get("Cookie") or ""))
+
+    def do_POST(self):
+        self.reply('{"$id": "session"}', cookie="a_session_project=user-a-secret; Path=/")
+
+    def reply(self, body: str, cookie: str = None):
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if cookie:
+            self.send_header("Set-Cookie", cookie)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class PooledTransportCookieTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), CookieEchoHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.pool = PooledTransport(pool_size=2, keepalive_expiry=5, connect_timeout=1, read_timeout=5, http2=False)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_set_cookie_is_not_sent_on_later_requests(self):
+        self.pool.request("POST", f"{self.url}/account/sessions/email")
+        self.assertEqual(self.pool.request("GET", f"{self.url}/account").json(), {"cookie": ""})
+
+    def test_session_cookie_does_not_leak_between_clients(self):
+        user_a, user_b = PooledClient(self.pool), PooledClient(self.pool)
+        for client in (user_a, user_b):
+            client.set_endpoint(self.url)
+            client.set_project("project")
+        user_b.set_session("user-b-session")
+
+        user_a.call("post", "/account/sessions/email", {"content-type": "application/json"}, {})
+        response = user_b.call("get", "/account", {"content-type": "application/json"})
+        self.assertEqual(response, {"cookie": ""})
+
+
+if __name__ == "__main__":
+    unittest.main()
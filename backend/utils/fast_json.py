@@ -0,0 +1,18 @@
+"""
+Fast row validation for high-volume list endpoints
+Validates a whole page of Appwrite rows in one pydantic-core call
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def validate_rows(model: Type[BaseModel], rows: List[Dict[str, Any]]) -> List[BaseModel]:
+    """Validate a page of Appwrite rows in a single pydantic-core call"""
+    return _list_adapter(model).validate_python(rows)
@@ -0,0 +1,103 @@
+"""
+Field projection for list endpoints
+Maps a `fields=` query parameter to Appwrite Query.select and validates
+only the selected fields instead of rebuilding the full model
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel, ConfigDict, Field, create_model, field_validator
+
+
+def field_keys(model: Type[BaseModel]) -> Dict[str, str]:
+    """API field name -> Appwrite column key (e.g. id -> $id)"""
+    return {name: info.alias or name for name, info in model.model_fields.items()}
+
+
+def field_selector(model: Type[BaseModel]) -> Callable:
+    """
+    Dependency that parses `?fields=a,b,c` for `model`.
+    Returns None when no projection was requested; 400 on unknown fields.
+    Accepts either field names or their Appwrite keys ("id" or "$id").
+    """
+    keys = field_keys(model)
+    by_key = {key: name for name, key in keys.items()}
+
+    async def dependency(
+        fields: Optional[str] = Query(
+            default=None,
+            description=f"Comma-separated {model.__name__} fields to return (default: all)"
+        )
+    ) -> Optional[Tuple[str, ...]]:
+        if not fields:
+            return None
+
+        selected = {"id": None}
+        unknown = []
+        for raw in fields.split(","):
+            raw = raw.strip()
+            if not raw:
+                continue
+            name = raw if raw in keys else by_key.get(raw)
+            if name is None:
+                unknown.append(raw)
+            else:
+                selected[name] = None
+
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(keys)}"
+            )
+        return tuple(selected)
+
+    return dependency
+
+
+def select_keys(model: Type[BaseModel], names: Tuple[str, ...]) -> List[str]:
+    """
+    Column keys for Query.select.
+    System attributes ($id, $createdAt, ...) are returned on every row, so only user columns are listed.
+    """
+    keys = field_keys(model)
+    columns = [keys[name] for name in names if not keys[name].startswith("$")]
+    return columns or ["$id"]
+
+
+@lru_cache(maxsize=256)
+def partial_model(model: Type[BaseModel], names: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    A model with just `names` (all optional) and only the validators for those fields,
+    so e.g. Order.items JSON is not parsed unless `items` was requested.
+    Keeps the model's config (json_encoders etc.), so projected rows serialise like full ones.
+    """
+    fields: Dict[str, Any] = {}
+    for name in names:
+        info = model.model_fields[name]
+        fields[name] = (Optional[info.annotation], Field(None, alias=info.alias))
+
+    validators = {}
+    for decorator in model.__pydantic_decorators__.field_validators.values():
+        wanted = [f for f in decorator.info.fields if f in names]
+        if wanted:
+            validators[decorator.cls_var_name] = field_validator(
+                *wanted, mode=decorator.info.mode
+            )(decorator.func.__func__)
+
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(model.model_config, populate_by_name=True),
+        __validators__=validators,
+        **fields
+    )
+
+
+def project_rows(
+    model: Type[BaseModel],
+    rows: List[Dict[str, Any]],
+    names: Tuple[str, ...]
+) -> List[BaseModel]:
+    """Validate Appwrite rows against the partial model for `names`"""
+    partial = partial_model(model, names)
+    return [partial.model_validate(row) for row in rows]